@@ -0,0 +1,293 @@
+"""
+Headless HTTP inference service, run next to the Streamlit UI.
+
+Endpoints:
+    POST /classify         one image, as multipart field "file" or a raw image body
+    POST /classify/batch   several images, as multipart fields "files"
+    GET  /health           model and queue status
+
+Each response gives the detected fruit, its confidence, its nutrition and
+the recommendations for every goal as JSON. It uses the same
+process-wide model, micro-batcher, prediction cache and nutrition store as
+app.py.
+
+Multipart bodies are parsed as they arrive and file parts are spooled to
+temporary files, so a large upload is never held in memory twice. A file
+part is refused with 413 as soon as it passes IMAGE_MAX_BYTES, before the
+rest of it is spooled. At most
+API_MAX_PENDING images are admitted at once. Beyond that the service
+answers 429 with Retry-After instead of letting latency grow without
+bound.
+
+Usage:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+    curl -F file=@apple.jpg localhost:8000/classify
+    curl -F files=@a.jpg -F files=@b.jpg localhost:8000/classify/batch
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from helper import metrics
+from helper.functions import IMAGE_MAX_BYTES, ImageDecodeError
+from helper.inference import get_batcher
+from helper.model_registry import model_stats, warm_up
+from helper.nutrition_store import get_nutrition
+from helper.prediction_cache import get_prediction_cache, image_key
+from helper.recommendations import GOALS, get_fruit_recommendations, thaw
+
+API_MAX_PENDING = int(os.environ.get("API_MAX_PENDING", "64"))
+API_MAX_BATCH = int(os.environ.get("API_MAX_BATCH", "32"))
+API_WORKERS = int(os.environ.get("API_WORKERS", "8"))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AdmissionQueue:
+    """
+    Count the images being served and refuse new ones past ``capacity``.
+
+    Only touched from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.pending = 0
+        self.rejected = 0
+
+    def full(self):
+        return self.pending >= self.capacity
+
+    def try_acquire(self, count=1):
+        if self.pending + count > self.capacity:
+            self.rejected += 1
+            return False
+        self.pending += count
+        return True
+
+    def release(self, count=1):
+        self.pending -= count
+
+
+_admission = AdmissionQueue(API_MAX_PENDING)
+_executor = ThreadPoolExecutor(API_WORKERS, thread_name_prefix="api")
+
+
+def describe(fruit, confidence):
+    """
+    Build the JSON result for one prediction.
+    """
+    result = {"fruit": fruit, "confidence": round(float(confidence), 6)}
+    if fruit is None:
+        return result
+    nutrition, volume = get_nutrition(fruit)
+    result["nutrition"] = nutrition
+    result["volume"] = volume or None
+    result["recommendations"] = {goal: thaw(get_fruit_recommendations(fruit, goal)) for goal in GOALS}
+    return result
+
+
+def error_response(e):
+    """
+    Map a classification failure to ``(status, message)``. Only an image
+    that cannot be decoded gets a 422 (malformed requests are refused with
+    400/413 while reading them); anything else is a 500 whose details stay
+    in the server log.
+    """
+    if isinstance(e, ImageDecodeError):
+        return 422, "Image could not be decoded"
+    print(f"Error classifying image: {e!r}")
+    return 500, "Internal error"
+
+
+def classify_one(image_bytes):
+    with metrics.request("api_classify", image_bytes=len(image_bytes)):
+        fruit, confidence = get_prediction_cache().get_or_compute(
+            image_bytes, lambda: get_batcher().classify(image_bytes)
+        )
+        return describe(fruit, confidence)
+
+
+def classify_many(images):
+    """
+    Classify ``(filename, bytes)`` pairs. Cache misses are all queued on the
+    micro-batcher before any result is awaited, so they share forward passes.
+    A file that cannot be decoded gets an ``error`` entry instead of failing
+    the whole batch.
+    """
+    cache = get_prediction_cache()
+    batcher = get_batcher()
+    with metrics.request("api_classify_batch", images=len(images)):
+        pending = []
+        for filename, image_bytes in images:
+            key = image_key(image_bytes)
+            try:
+                pending.append((filename, key, cache.get(key) or batcher.submit(image_bytes)))
+            except Exception as e:
+                pending.append((filename, key, e))
+
+        results = []
+        for filename, key, outcome in pending:
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                if not isinstance(outcome, tuple):
+                    outcome = outcome.result()
+                    cache.put(key, outcome)
+                results.append({"filename": filename, **describe(*outcome)})
+            except Exception as e:
+                results.append({"filename": filename, "error": error_response(e)[1]})
+        return results
+
+
+async def _read_stream(chunks, limit=IMAGE_MAX_BYTES):
+    data = bytearray()
+    async for chunk in chunks:
+        data += chunk
+        if len(data) > limit:
+            raise HTTPException(413, f"Image larger than {limit} bytes")
+    return bytes(data)
+
+
+async def _read_upload(upload, limit=IMAGE_MAX_BYTES):
+    async def chunks():
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+    return await _read_stream(chunks(), limit)
+
+
+class _FileTooLarge(MultiPartException):
+    pass
+
+
+class LimitedMultiPartParser(MultiPartParser):
+    """
+    Starlette's multipart parser, but a file part larger than
+    ``max_file_size`` is refused while it is being parsed.
+    """
+
+    def __init__(self, *args, max_file_size=IMAGE_MAX_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_file_size = max_file_size
+        self._part_size = 0
+
+    def on_part_begin(self):
+        super().on_part_begin()
+        self._part_size = 0
+
+    def on_part_data(self, data, start, end):
+        if self._current_part.file is not None:
+            self._part_size += end - start
+            if self._part_size > self.max_file_size:
+                raise _FileTooLarge(f"Image larger than {self.max_file_size} bytes")
+        super().on_part_data(data, start, end)
+
+
+async def read_images(request, field, max_files):
+    """
+    Return ``[(filename, bytes)]`` from a multipart form field, or from the
+    raw request body when the request is not multipart.
+    """
+    length = request.headers.get("content-length")
+    if length is not None:
+        try:
+            length = int(length)
+        except ValueError:
+            raise HTTPException(400, "Invalid Content-Length header")
+        if length > IMAGE_MAX_BYTES * max_files:
+            raise HTTPException(413, "Request body too large")
+
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return [(None, await _read_stream(request.stream()))]
+
+    parser = LimitedMultiPartParser(request.headers, request.stream(), max_files=max_files,
+                                    max_fields=max_files, max_file_size=IMAGE_MAX_BYTES)
+    try:
+        form = await parser.parse()
+    except _FileTooLarge as e:
+        raise HTTPException(413, e.message)
+    except MultiPartException as e:
+        raise HTTPException(400, e.message)
+    try:
+        uploads = [upload for upload in form.getlist(field) if hasattr(upload, "read")]
+        if not uploads:
+            raise HTTPException(400, f"Expected image files in form field {field!r}")
+        return [(upload.filename, await _read_upload(upload)) for upload in uploads]
+    finally:
+        await form.close()
+
+
+def _busy():
+    return JSONResponse({"error": "Too many pending images, retry later"}, status_code=429,
+                        headers={"Retry-After": "1"})
+
+
+async def _run(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def classify(request):
+    # Refuse before reading the upload, so a busy server does not spend bandwidth
+    if not _admission.try_acquire():
+        return _busy()
+    try:
+        [(_, image_bytes)] = await read_images(request, "file", 1)
+        return JSONResponse(await _run(classify_one, image_bytes))
+    except HTTPException:
+        raise
+    except Exception as e:
+        status, message = error_response(e)
+        return JSONResponse({"error": message}, status_code=status)
+    finally:
+        _admission.release()
+
+
+async def classify_batch(request):
+    if _admission.full():
+        return _busy()
+    images = await read_images(request, "files", API_MAX_BATCH)
+    if not _admission.try_acquire(len(images)):
+        return _busy()
+    try:
+        return JSONResponse({"results": await _run(classify_many, images)})
+    finally:
+        _admission.release(len(images))
+
+
+async def health(request):
+    stats = model_stats()
+    return JSONResponse({
+        "model_loaded": stats["loaded"] or stats["engine_seconds"] is not None,
+        "warmed_up": stats["warmed_up"],
+        "backend": stats["backend"],
+        "pending": _admission.pending,
+        "capacity": _admission.capacity,
+        "rejected": _admission.rejected,
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model before taking traffic
+    await _run(warm_up)
+    metrics.start_http_server()
+    yield
+    get_batcher().close()
+    _executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/classify", classify, methods=["POST"]),
+        Route("/classify/batch", classify_batch, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
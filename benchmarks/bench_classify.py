@@ -0,0 +1,263 @@
+"""
+Latency and throughput of the classify path, stage by stage.
+
+Synthetic JPEG and PNG photos at several resolutions are pushed through:
+    - decode:      ``decode_image`` (open, convert, resize)
+    - preprocess:  ``preprocess_image`` (decode plus float32 normalisation)
+    - forward:     one engine call on a preprocessed (1, 224, 224, 3) batch
+    - end_to_end:  ``MicroBatcher.classify``, the path behind
+                   ``prepare_image_from_bytes`` minus the prediction cache
+
+Latencies are reported as p50/p95/p99. Throughput is measured for batched
+preprocess + forward at batch sizes 1-64 and for concurrent ``classify``
+callers at several thread counts.
+
+When the configured model file is missing (a CPU-only CI box without
+model/model.pkl) a small NumPy stand-in model is used, so the decode and
+batching numbers stay meaningful. The forward pass numbers then do not
+reflect the real network, and the JSON records which model was used.
+
+Usage:
+    python -m benchmarks.bench_classify --out bench.json
+    python -m benchmarks.bench_classify --compare baseline.json --tolerance 0.15
+    python -m benchmarks.bench_classify --quick --stand-in
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.bench_decode import make_image
+from helper.engine import INPUT_SHAPE
+from helper.functions import decode_image, preprocess_batch, preprocess_image
+from helper.inference import MicroBatcher, fruits_list
+from helper.model_registry import BACKEND, get_engine, model_path
+
+RESOLUTIONS = {
+    "VGA": (640, 480),
+    "1080p": (1920, 1080),
+    "12MP": (4000, 3000),
+}
+FORMATS = ("JPEG", "PNG")
+BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64)
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+class StandInEngine:
+    """
+    NumPy classifier with the real input and output shapes: 8x8 average
+    pooling followed by two dense layers and a softmax.
+    """
+
+    name = "stand-in"
+
+    def __init__(self, num_classes=len(fruits_list), hidden=512, seed=0):
+        rng = np.random.default_rng(seed)
+        features = (INPUT_SHAPE[0] // 8) * (INPUT_SHAPE[1] // 8) * INPUT_SHAPE[2]
+        self.w1 = rng.normal(0, features ** -0.5, (features, hidden)).astype(np.float32)
+        self.w2 = rng.normal(0, hidden ** -0.5, (hidden, num_classes)).astype(np.float32)
+
+    def __call__(self, batch):
+        n, height, width, channels = batch.shape
+        pooled = batch.reshape(n, height // 8, 8, width // 8, 8, channels).mean(axis=(2, 4))
+        hidden = np.maximum(pooled.reshape(n, -1) @ self.w1, 0)
+        logits = hidden @ self.w2
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def warm_up(self, batch_size=1):
+        self(np.zeros((batch_size,) + INPUT_SHAPE, dtype=np.float32))
+
+
+def load_engine(stand_in=False):
+    """
+    Return ``(engine, label)``; the stand-in is used when asked for or when
+    the configured model file does not exist.
+    """
+    if stand_in or not os.path.exists(model_path()):
+        return StandInEngine(), "stand-in"
+    return get_engine(), f"{BACKEND}:{model_path()}"
+
+
+def percentiles(timings):
+    """
+    Return p50/p95/p99 (nearest rank) of ``timings`` in milliseconds.
+    """
+    ordered = sorted(timings)
+    last = len(ordered) - 1
+    return {
+        f"p{p}_ms": ordered[round(p / 100 * last)] * 1000
+        for p in (50, 95, 99)
+    }
+
+
+def _time_calls(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_latency(images, engine, iterations, warmup):
+    """
+    Per-stage latency for every synthetic image.
+    """
+    results = {}
+    batch = np.random.default_rng(0).random((1,) + INPUT_SHAPE, dtype=np.float32)
+    results["latency/forward"] = percentiles(_time_calls(lambda: engine(batch), iterations, warmup))
+
+    batcher = MicroBatcher(predict_fn=engine, max_wait_ms=0)
+    try:
+        for label, image_bytes in images.items():
+            stages = {
+                "decode": lambda: decode_image(image_bytes),
+                "preprocess": lambda: preprocess_image(image_bytes),
+                "end_to_end": lambda: batcher.classify(image_bytes),
+            }
+            for stage, fn in stages.items():
+                results[f"latency/{stage}/{label}"] = percentiles(_time_calls(fn, iterations, warmup))
+    finally:
+        batcher.close()
+    return results
+
+
+def bench_batch_throughput(image_bytes, engine, batch_sizes, rounds):
+    """
+    Images per second for batched preprocess + forward at each batch size.
+    """
+    results = {}
+    for batch_size in batch_sizes:
+        images = [image_bytes] * batch_size
+        engine(preprocess_batch(images))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            engine(preprocess_batch(images))
+        elapsed = time.perf_counter() - start
+        results[f"throughput/batch/{batch_size}"] = {"images_per_s": batch_size * rounds / elapsed}
+    return results
+
+
+def bench_thread_throughput(image_bytes, engine, thread_counts, requests_per_thread):
+    """
+    Images per second and per-request latency with several threads calling
+    ``MicroBatcher.classify`` at once, as concurrent sessions do.
+    """
+    results = {}
+    for threads in thread_counts:
+        batcher = MicroBatcher(predict_fn=engine)
+
+        def worker():
+            return _time_calls(lambda: batcher.classify(image_bytes), requests_per_thread, 1)
+
+        try:
+            with ThreadPoolExecutor(threads) as pool:
+                start = time.perf_counter()
+                timings = sum(pool.map(lambda _: worker(), range(threads)), [])
+                elapsed = time.perf_counter() - start
+        finally:
+            batcher.close()
+        results[f"throughput/threads/{threads}"] = {
+            "images_per_s": threads * (requests_per_thread + 1) / elapsed,
+            **percentiles(timings),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return messages for metrics that regressed by more than ``tolerance``
+    (a fraction): latencies that grew or throughputs that dropped.
+    """
+    regressions = []
+    for key, metrics in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        for metric, value in metrics.items():
+            old = before.get(metric)
+            if not old:
+                continue
+            if metric == "images_per_s":
+                regressed = value < old * (1 - tolerance)
+            else:
+                regressed = value > old * (1 + tolerance)
+            if regressed:
+                regressions.append(f"{key} {metric}: {old:.2f} -> {value:.2f} ({(value - old) / old:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--threads", type=int, nargs="+", default=list(THREAD_COUNTS))
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and only the VGA images")
+    parser.add_argument("--stand-in", action="store_true", help="Use the NumPy stand-in model")
+    parser.add_argument("--out", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to flag regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed change, as a fraction")
+    args = parser.parse_args()
+
+    resolutions = {"VGA": RESOLUTIONS["VGA"]} if args.quick else RESOLUTIONS
+    iterations = min(args.iterations, 10) if args.quick else args.iterations
+
+    engine, engine_label = load_engine(args.stand_in)
+    engine.warm_up()
+    images = {
+        f"{name}/{image_format.lower()}": make_image(size, image_format)
+        for name, size in resolutions.items()
+        for image_format in FORMATS
+    }
+    reference = images[f"{next(iter(resolutions))}/jpeg"]
+
+    results = {}
+    results.update(bench_latency(images, engine, iterations, args.warmup))
+    results.update(bench_batch_throughput(reference, engine, args.batch_sizes, max(iterations // 5, 2)))
+    results.update(bench_thread_throughput(reference, engine, args.threads, iterations))
+
+    print(f"{'metric':<34}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'img/s':>9}")
+    for key, metrics in results.items():
+        cells = [f"{metrics[m]:>9.2f}" if m in metrics else f"{'':>9}"
+                 for m in ("p50_ms", "p95_ms", "p99_ms", "images_per_s")]
+        print(f"{key:<34}{''.join(cells)}")
+
+    report = {
+        "meta": {
+            "engine": engine_label,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["engine"] != engine_label:
+            print(f"Note: baseline used {baseline['meta']['engine']}, this run used {engine_label}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Decode time and peak memory of full decoding versus JPEG draft mode.
+
+Each case runs in a fresh process so its peak RSS is not hidden by an earlier,
+larger case.
+
+Usage:
+    python -m benchmarks.bench_decode --repeat 5
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+from PIL import Image
+
+SIZES = {
+    "4K": (3840, 2160),
+    "12MP": (4000, 3000),
+}
+
+
+def make_image(size, image_format="JPEG", quality=90, seed=0):
+    """
+    Build a photo-like image: smooth gradients plus a little noise.
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels += rng.normal(0, 8, pixels.shape).astype(np.float32)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(buffer, format=image_format, quality=quality)
+    else:
+        image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_jpeg(size, quality=90, seed=0):
+    return make_image(size, "JPEG", quality, seed)
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_case(args):
+    from helper.functions import decode_image
+
+    image_bytes, draft, repeat = args
+    baseline = _peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_image(image_bytes, preview_size=(200, 200), draft=draft)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, _peak_rss_mb() - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'image':<8}{'mode':<8}{'decode ms':>11}{'peak +MB':>10}")
+    for label, size in SIZES.items():
+        image_bytes = make_jpeg(size)
+        for draft in (False, True):
+            with context.Pool(1) as pool:
+                decode_ms, peak_mb = pool.apply(_run_case, ((image_bytes, draft, args.repeat),))
+            mode = "draft" if draft else "full"
+            print(f"{label:<8}{mode:<8}{decode_ms:>11.1f}{peak_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
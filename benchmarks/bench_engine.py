@@ -0,0 +1,68 @@
+"""
+Compare Keras ``model.predict`` with the graph-mode KerasEngine on CPU.
+
+Usage:
+    CUDA_VISIBLE_DEVICES= python -m benchmarks.bench_engine --batch-sizes 1 8 32
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from helper.engine import INPUT_SHAPE, KerasEngine
+from helper.model_registry import get_model
+
+
+def _time_calls(fn, batch, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(batch)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def benchmark(batch_sizes=(1, 8, 32), iterations=50, warmup=3):
+    """
+    Time both inference paths for each batch size.
+
+    Returns:
+        - list: One dict per (path, batch size) with median and p95 latency in ms.
+    """
+    model = get_model()
+    engine = KerasEngine(model)
+    paths = {
+        "model.predict": lambda batch: model.predict(batch, verbose=0),
+        "engine": engine,
+    }
+
+    results = []
+    for batch_size in batch_sizes:
+        batch = np.random.rand(batch_size, *INPUT_SHAPE).astype(np.float32)
+        for name, fn in paths.items():
+            _time_calls(fn, batch, warmup)
+            timings = sorted(_time_calls(fn, batch, iterations))
+            results.append({
+                "path": name,
+                "batch_size": batch_size,
+                "p50_ms": statistics.median(timings) * 1000,
+                "p95_ms": timings[int(0.95 * (len(timings) - 1))] * 1000,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'path':<15}{'batch':>6}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in benchmark(args.batch_sizes, args.iterations):
+        print(f"{row['path']:<15}{row['batch_size']:>6}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Cold-start import profile of the app's entry points.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``.
+The report lists the total import time, the slowest top-level packages
+(the self time of all their modules, at any depth of the import tree) and
+any heavy package that was imported, directly or through another package,
+although the target should not need it at startup.
+
+Results can be saved as a baseline and later runs compared against it, so an
+import that creeps back into the startup path shows up as a regression. Only
+the repo's own and third-party packages are saved and compared: which
+standard library modules load differs between platforms and Python versions.
+A run regresses when those packages take longer than the baseline by more
+than ``--tolerance`` (a fraction) plus ``--slack-ms``, or when a new one
+appears.
+
+Only TensorFlow is kept off the app's startup path. app.py still imports
+numpy, PIL and requests through helper.functions and helper.nutrition_store,
+since the first upload needs them anyway.
+
+Usage:
+    python -m benchmarks.bench_importtime
+    python -m benchmarks.bench_importtime --save benchmarks/importtime_baseline.json
+    python -m benchmarks.bench_importtime --compare benchmarks/importtime_baseline.json --tolerance 0.25 --slack-ms 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Site hooks that depend on the environment, not on the code
+SITE_MODULES = {"sitecustomize", "usercustomize"}
+
+# New packages cheaper than this are import attempts of optional
+# dependencies (``-X importtime`` lists failed imports too), not regressions
+NEW_PACKAGE_MIN_MS = 1.0
+
+# Target module -> packages it must not import at startup
+TARGETS = {
+    "helper": ["tensorflow", "numpy", "PIL", "requests", "bs4"],
+    "helper.nutrition_store": ["tensorflow", "numpy", "PIL"],
+    "helper.inference": ["tensorflow"],
+    "helper.prediction_cache": ["tensorflow"],
+}
+
+
+def profile_import(module, repeat=3):
+    """
+    Import ``module`` in ``repeat`` fresh interpreters.
+
+    Returns:
+        - dict: Median ``total_ms`` and ``{package: ms}`` for every top-level
+          package imported.
+    """
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+        runs.append(parse_importtime(result.stderr))
+
+    packages = set().union(*(run.keys() for run in runs))
+    by_package = {name: statistics.median(run.get(name, 0.0) for run in runs) for name in packages}
+    return {
+        "total_ms": statistics.median(sum(run.values()) for run in runs),
+        "packages": dict(sorted(by_package.items(), key=lambda item: -item[1])),
+    }
+
+
+def parse_importtime(stderr):
+    """
+    Sum the self time of every module in ``-X importtime`` output, grouped by
+    top-level package.
+
+    Lines look like ``import time:  self [us] | cumulative | imported package``.
+    Nested imports are indented two spaces per level and are listed before
+    the module that imported them. Every line is counted, however deep, so
+    transitive imports are seen. Summing self times counts each microsecond
+    once, and the sum over all packages is the total import time.
+    """
+    by_package = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + int(self_us) / 1000
+    return by_package
+
+
+def tracked_packages(packages):
+    """
+    Keep the repo's own and third-party packages of a ``{package: ms}`` dict,
+    dropping the standard library, built-in modules, site hooks and private
+    helpers such as ``_distutils_hack``.
+    """
+    ignored = set(sys.stdlib_module_names) | set(sys.builtin_module_names) | SITE_MODULES
+    return {name: ms for name, ms in packages.items() if name not in ignored and not name.startswith("_")}
+
+
+def forbidden_imports(module, report):
+    return sorted(set(TARGETS.get(module, [])) & set(report["packages"]))
+
+
+def compare(results, baseline, tolerance, slack_ms=5.0):
+    """
+    Return a list of messages for targets whose tracked packages (see
+    ``tracked_packages``) got slower than the baseline by more than
+    ``tolerance`` (a fraction) plus ``slack_ms``, or that import a tracked
+    package the baseline did not (taking at least ``NEW_PACKAGE_MIN_MS``).
+    """
+    regressions = []
+    for module, report in results.items():
+        if module not in baseline:
+            continue
+        before = tracked_packages(baseline[module]["packages"])
+        after = tracked_packages(report["packages"])
+        before_ms, after_ms = sum(before.values()), sum(after.values())
+        if after_ms > before_ms * (1 + tolerance) + slack_ms:
+            regressions.append(f"{module}: {before_ms:.1f} ms -> {after_ms:.1f} ms")
+        new_packages = [name for name in set(after) - set(before) if after[name] >= NEW_PACKAGE_MIN_MS]
+        if new_packages:
+            regressions.append(f"{module}: now imports {', '.join(sorted(new_packages))}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Packages listed per target")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Allowed slowdown on top of --tolerance")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for module in args.targets:
+        try:
+            report = profile_import(module, args.repeat)
+        except RuntimeError as e:
+            print(e)
+            failed = True
+            continue
+        results[module] = report
+        print(f"\nimport {module}: {report['total_ms']:.1f} ms")
+        for package, ms in list(report["packages"].items())[:args.top]:
+            print(f"    {package:<28}{ms:>9.1f} ms")
+        forbidden = forbidden_imports(module, report)
+        if forbidden:
+            print(f"    eagerly imports: {', '.join(forbidden)}")
+            failed = True
+
+    if args.save:
+        saved = {module: {"total_ms": report["total_ms"], "packages": tracked_packages(report["packages"])}
+                 for module, report in results.items()}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2)
+        print(f"\nResults written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.slack_ms)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
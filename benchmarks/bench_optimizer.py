@@ -0,0 +1,93 @@
+"""
+How the combination optimizer scales as the food catalogue grows.
+
+Synthetic catalogues with fruit-like nutrient ranges are generated at each
+size. Branch-and-bound ``top_combinations`` is timed against the vectorized
+brute force (skipped once C(n, k) gets too large). The benchmark checks that
+both return the same top-N scores and reports how much of the search tree
+was pruned. With ``--must-include``, k = 1 is always added to the cross-check,
+since it leaves no free slot beside the forced food.
+
+Usage:
+    python -m benchmarks.bench_optimizer
+    python -m benchmarks.bench_optimizer --sizes 10 100 500 1000 --k 3 4 --top-n 5
+"""
+
+import argparse
+import sys
+import time
+from math import comb
+
+import numpy as np
+
+from helper.optimizer import GOAL_OBJECTIVES, brute_force_top, top_combinations
+
+SIZES = (10, 50, 100, 200, 500)
+# Brute force holds every combination in memory; skip it beyond this many
+BRUTE_FORCE_LIMIT = 3_000_000
+
+
+def make_catalogue(size, seed=0):
+    """
+    Build ``size`` foods with per-100g values in realistic fruit ranges.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        f"food-{i:04d}": {
+            'kalori': int(rng.integers(15, 180)),
+            'lemak': round(float(rng.gamma(1.0, 0.8)), 1),
+            'karbohidrat': round(float(rng.uniform(4, 30)), 1),
+            'protein': round(float(rng.gamma(2.0, 0.5)), 1),
+            'serat': round(float(rng.gamma(2.0, 1.2)), 1),
+        }
+        for i in range(size)
+    }
+
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--k", type=int, nargs="+", default=[3])
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--goal", choices=sorted(GOAL_OBJECTIVES), default="lose_weight")
+    parser.add_argument("--must-include", action="store_true",
+                        help="Force the first food into every combination, like a detected fruit")
+    args = parser.parse_args()
+
+    objective = GOAL_OBJECTIVES[args.goal]
+    mismatches = 0
+    print(f"{'foods':>6}{'k':>3}{'combinations':>15}{'b&b ms':>10}{'scored':>12}{'pruned':>10}"
+          f"{'brute ms':>10}{'match':>7}")
+    for size in args.sizes:
+        catalogue = make_catalogue(size)
+        must_include = next(iter(catalogue)) if args.must_include else None
+        # With a forced food, k == 1 leaves no free slot; always check that edge
+        for k in (sorted({1, *args.k}) if must_include else args.k):
+            stats = {}
+            best, bnb_ms = _time(lambda: top_combinations(
+                k, objective, args.top_n, must_include, catalogue, stats=stats))
+
+            free = size - (1 if must_include else 0)
+            combinations = comb(free, k - (1 if must_include else 0))
+            brute_ms, match = "-", "-"
+            if combinations <= BRUTE_FORCE_LIMIT:
+                reference, elapsed = _time(lambda: brute_force_top(k, objective, args.top_n, must_include, catalogue))
+                brute_ms = f"{elapsed:.1f}"
+                same = np.allclose([r['score'] for r in best], [r['score'] for r in reference])
+                match = "yes" if same else "NO"
+                mismatches += not same
+
+            print(f"{size:>6}{k:>3}{combinations:>15,}{bnb_ms:>10.1f}{stats['scored']:>12,}"
+                  f"{stats['pruned']:>10,}{brute_ms:>10}{match:>7}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
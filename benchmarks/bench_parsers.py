@@ -0,0 +1,73 @@
+"""
+Time every installed HTML parser backend on saved fatsecret pages and check
+that they all extract identical values.
+
+Usage:
+    python -m benchmarks.bench_parsers --fixtures tests/fixtures/pages --repeat 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from helper.parsers import available_backends, parse_food_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "pages")
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """
+    Return ``{file name: page bytes}`` for every .html file in ``directory``.
+    """
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as f:
+                fixtures[name] = f.read()
+    return fixtures
+
+
+def check_agreement(fixtures, backends):
+    """
+    Return a list of (fixture, backend, page, reference page) mismatches,
+    using the first backend as the reference.
+    """
+    mismatches = []
+    for name, html in fixtures.items():
+        reference = parse_food_page(html, backends[0])
+        for backend in backends[1:]:
+            page = parse_food_page(html, backend)
+            if page != reference:
+                mismatches.append((name, backend, page, reference))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    # html.parser first, so it is the reference the fast backends must match
+    backends = sorted(available_backends(), key=lambda name: name != "html.parser")
+
+    mismatches = check_agreement(fixtures, backends)
+    for name, backend, page, reference in mismatches:
+        print(f"MISMATCH {name} [{backend}]: {page} != {reference}")
+
+    print(f"{'backend':<13}{'ms/page':>10}")
+    for backend in backends:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in fixtures.values():
+                parse_food_page(html, backend)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:<13}{elapsed * 1000 / (args.repeat * len(fixtures)):>10.3f}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Throughput of the shared-memory preprocessing pool as worker processes are
+added, to check that decoding scales across cores.
+
+Usage:
+    python -m benchmarks.bench_preprocess_pool --images 256 --batch-size 32
+    python -m benchmarks.bench_preprocess_pool --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.bench_decode import make_jpeg
+from helper.preprocess_pool import SharedBatchPool
+
+
+def default_worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def run(images, workers, batch_size):
+    """
+    Push every image through a fresh pool; return images per second.
+    """
+    items = [(str(i), image, None) for i, image in enumerate(images)]
+    with SharedBatchPool(workers, batch_size) as pool:
+        # Start the workers before the clock, spawn cost is not decode cost
+        for _ in pool.iter_batches(items[:workers]):
+            pass
+        start = time.perf_counter()
+        for _ in pool.iter_batches(items):
+            pass
+        elapsed = time.perf_counter() - start
+    return len(images) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    # A handful of distinct photos, repeated, keeps setup time short
+    distinct = [make_jpeg((args.width, args.height), seed=seed) for seed in range(8)]
+    images = [distinct[i % len(distinct)] for i in range(args.images)]
+
+    print(f"{'workers':<9}{'images/s':>10}{'speedup':>9}")
+    baseline = None
+    for workers in args.workers or default_worker_counts():
+        rate = run(images, workers, args.batch_size)
+        baseline = baseline or rate
+        print(f"{workers:<9}{rate:>10.1f}{rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
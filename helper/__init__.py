@@ -5,34 +5,163 @@ This package provides functionality for scraping nutrition data,
 food information, and various utility functions.
 """
 
-# Import and expose functions from scrap.py
-from .scrap import (
-    scrape_nutrition_data,
-    scrape_portion_links,
-    scrape_portion_nutrition,
-)
-
-
-# Import and expose utility functions
-from .functions import (
-    convert_weight_to_grams,
-    safe_convert,
-    get_image_from_url,
-    get_image_from_path,
-    preprocess_image
-)
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so
+# "import helper" stays cheap and only the modules a caller actually uses
+# pull in requests, numpy, PIL or TensorFlow.
+_LAZY_ATTRIBUTES = {
+    # Scraping functions
+    'FoodPage': 'scrap',
+    'fetch_food_page': 'scrap',
+    'parse_food_page': 'scrap',
+    'scrape_nutrition_data': 'scrap',
+    'scrape_portion_links': 'scrap',
+    'scrape_portion_nutrition': 'scrap',
+    'scrape_portion_nutrition_async': 'scrap',
+
+    # Shared HTTP client
+    'get_session': 'http_client',
+    'http_stats': 'http_client',
+
+    # Local nutrition store
+    'fruits_nutrition_db': 'nutrition_store',
+    'NutritionStore': 'nutrition_store',
+    'get_nutrition': 'nutrition_store',
+    'get_nutrition_store': 'nutrition_store',
+
+    # Utility functions
+    'convert_weight_to_grams': 'functions',
+    'safe_convert': 'functions',
+    'get_image_from_url': 'functions',
+    'get_image_from_path': 'functions',
+    'open_image_mmap': 'functions',
+    'fetch_image': 'functions',
+    'fetch_images_async': 'functions',
+    'sniff_image_format': 'functions',
+    'preprocess_image': 'functions',
+    'preprocess_into': 'functions',
+    'preprocess_batch': 'functions',
+    'decode_image': 'functions',
+    'ImageDecodeError': 'functions',
+    'load_image': 'functions',
+    'load_preview': 'functions',
+
+    # Local image source
+    'iter_image_paths': 'image_source',
+    'iter_images': 'image_source',
+
+    # Multiprocess preprocessing pool
+    'SharedBatchPool': 'preprocess_pool',
+
+    # Shared model registry
+    'get_model': 'model_registry',
+    'get_engine': 'model_registry',
+    'warm_up': 'model_registry',
+    'warm_up_in_background': 'model_registry',
+    'model_stats': 'model_registry',
+    'model_checksum': 'model_registry',
+
+    # Prediction cache
+    'PredictionCache': 'prediction_cache',
+    'get_prediction_cache': 'prediction_cache',
+
+    # Batched inference
+    'fruits_list': 'inference',
+    'classify_batch': 'inference',
+    'MicroBatcher': 'inference',
+    'get_batcher': 'inference',
+
+    # Recommendations
+    'get_fruit_recommendations': 'recommendations',
+
+    # Combination optimizer
+    'Objective': 'optimizer',
+    'top_combinations': 'optimizer',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 # Define what gets imported with "from helper import *"
 __all__ = [
     # Scraping functions
+    'FoodPage',
+    'fetch_food_page',
+    'parse_food_page',
     'scrape_nutrition_data',
     'scrape_portion_links',
     'scrape_portion_nutrition',
+    'scrape_portion_nutrition_async',
+
+    # HTTP client
+    'get_session',
+    'http_stats',
+
+    # Nutrition store
+    'fruits_nutrition_db',
+    'NutritionStore',
+    'get_nutrition',
+    'get_nutrition_store',
     
     # Utility functions
     'convert_weight_to_grams',
     'safe_convert',
     'get_image_from_url',
     'get_image_from_path',
-    'preprocess_image'
+    'open_image_mmap',
+    'fetch_image',
+    'fetch_images_async',
+    'sniff_image_format',
+    'preprocess_image',
+    'preprocess_into',
+    'preprocess_batch',
+    'decode_image',
+    'ImageDecodeError',
+    'load_image',
+    'load_preview',
+
+    # Local image source
+    'iter_image_paths',
+    'iter_images',
+
+    # Multiprocess preprocessing
+    'SharedBatchPool',
+
+    # Model registry
+    'get_model',
+    'get_engine',
+    'warm_up',
+    'warm_up_in_background',
+    'model_stats',
+    'model_checksum',
+
+    # Prediction cache
+    'PredictionCache',
+    'get_prediction_cache',
+
+    # Batched inference
+    'fruits_list',
+    'classify_batch',
+    'MicroBatcher',
+    'get_batcher',
+
+    # Recommendations
+    'get_fruit_recommendations',
+
+    # Combination optimizer
+    'Objective',
+    'top_combinations',
 ]
\ No newline at end of file
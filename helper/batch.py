@@ -0,0 +1,274 @@
+"""
+Headless batch classification for folders, manifests and URL lists.
+
+Images stream through load -> decode -> batch -> infer -> join nutrition.
+Loading runs on an I/O thread pool and decoding on a CPU pool, each with a
+bounded number of images in flight, so memory stays flat on large archives.
+With ``--processes`` decoding moves to worker processes that fill
+shared-memory batches (see helper/preprocess_pool.py).
+
+The source can be:
+    - a directory, scanned recursively for images
+    - a .csv or .jsonl manifest with a "path" or "url" column
+    - any other text file with one path or URL per line
+
+Usage:
+    python -m helper.batch photos/ --out results.csv
+    python -m helper.batch manifest.jsonl --out results.parquet --batch-size 64 --io-workers 16
+    python -m helper.batch urls.txt --out results.jsonl --scrape
+    python -m helper.batch photos/ --out results.csv --processes 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+
+from .engine import INPUT_SHAPE
+from .functions import fetch_image, get_image_from_path, preprocess_image, sniff_image_format
+from .image_source import iter_image_paths
+from .inference import CONFIDENCE_THRESHOLD, decode_prediction
+from .model_registry import get_engine
+from .nutrition_store import NutritionStore
+from .preprocess_pool import SharedBatchPool
+from .scrap import scrape_nutrition_data
+
+NUTRIENT_COLUMNS = ["Kalori", "Lemak", "Karbohidrat", "Protein"]
+OUTPUT_COLUMNS = ["source", "fruit", "confidence"] + NUTRIENT_COLUMNS + ["volume", "error"]
+
+
+def iter_sources(source):
+    """
+    Yield ``(name, image)`` pairs, where ``image`` is a path or URL string.
+    Files are not opened here, so a broken one fails in the load stage and
+    still gets an error row.
+    """
+    if os.path.isdir(source):
+        yield from ((path, path) for path in iter_image_paths(source))
+        return
+
+    extension = os.path.splitext(source)[1].lower()
+    with open(source, encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            rows = csv.DictReader(f)
+        elif extension == ".jsonl":
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = ({"path": line.strip()} for line in f if line.strip() and not line.startswith("#"))
+        for row in rows:
+            location = row.get("url") or row.get("path")
+            if location:
+                yield location, location
+
+
+def load_image_bytes(image):
+    """
+    I/O stage: return encoded image bytes for a URL or path. Raises
+    ValueError for files that are missing, empty or not a known image format.
+    """
+    if not isinstance(image, str):
+        return image
+    if image.startswith(("http://", "https://")):
+        return fetch_image(image).data
+    data = get_image_from_path(image)
+    if sniff_image_format(data) is None:
+        raise ValueError("File is not a supported image.")
+    return data
+
+
+def fetch_url_bytes(image):
+    """
+    I/O stage for worker processes: download URLs, pass file paths through
+    so each worker maps the file itself.
+    """
+    if image.startswith(("http://", "https://")):
+        return fetch_image(image).data
+    return image
+
+
+def _bounded_map(executor, fn, items, window):
+    """
+    Lazily apply ``fn`` to ``(name, value, error)`` items on ``executor``,
+    keeping at most ``window`` calls in flight and yielding results in order.
+    Items that already carry an error are passed through untouched.
+    """
+    pending = deque()
+
+    def submit(item):
+        name, value, error = item
+        future = executor.submit(fn, value) if error is None else None
+        pending.append((name, error, future))
+
+    def collect():
+        name, error, future = pending.popleft()
+        if future is None:
+            return name, None, error
+        try:
+            return name, future.result(), None
+        except Exception as e:
+            return name, None, str(e)
+
+    for item in items:
+        submit(item)
+        if len(pending) >= window:
+            yield collect()
+    while pending:
+        yield collect()
+
+
+def _decode(data):
+    return preprocess_image(data)[0]
+
+
+def iter_batches(decoded, batch_size):
+    """
+    Group decoded images into ``(names, batch, failures)``. Each batch is a
+    view of one reused (batch_size, 224, 224, 3) buffer; failures are
+    ``(name, error)`` pairs collected since the previous batch.
+    """
+    buffer = np.empty((batch_size,) + INPUT_SHAPE, dtype=np.float32)
+    names, failures = [], []
+    for name, array, error in decoded:
+        if error is not None:
+            failures.append((name, error))
+            continue
+        buffer[len(names)] = array
+        names.append(name)
+        if len(names) == batch_size:
+            yield names, buffer, failures
+            names, failures = [], []
+    if names or failures:
+        yield names, buffer[:len(names)], failures
+
+
+class ResultWriter:
+    """
+    Write result rows as CSV, JSONL or Parquet, chosen by file extension.
+    """
+
+    def __init__(self, path, output_format=None):
+        self.path = path
+        self.format = output_format or os.path.splitext(path)[1].lstrip(".").lower()
+        if self.format not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Unknown output format: {self.format}")
+        self._rows = []
+        self._file = None
+        if self.format != "parquet":
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+                self._csv.writeheader()
+
+    def write(self, row):
+        if self.format == "csv":
+            self._csv.writerow(row)
+        elif self.format == "jsonl":
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self._rows.append(row)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        else:
+            import pandas as pd
+            pd.DataFrame(self._rows, columns=OUTPUT_COLUMNS).to_parquet(self.path, index=False)
+
+
+def classify_source(source, writer, batch_size=32, io_workers=8, cpu_workers=None,
+                    lookup_nutrition=None, threshold=CONFIDENCE_THRESHOLD, processes=0):
+    """
+    Run the whole pipeline over ``source`` and write one row per image.
+
+    With ``processes`` set, decoding runs in that many worker processes
+    writing into shared-memory batches instead of on the CPU thread pool.
+
+    Returns:
+        - dict: Counts of classified and failed images and elapsed seconds.
+    """
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+    lookup_nutrition = lookup_nutrition or NutritionStore(background_refresh=False).get
+    engine = get_engine()
+    nutrition_by_fruit = {}
+    counts = {"classified": 0, "failed": 0}
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        io_pool = stack.enter_context(ThreadPoolExecutor(io_workers, thread_name_prefix="batch-io"))
+        items = ((name, image, None) for name, image in iter_sources(source))
+        if processes:
+            loaded = _bounded_map(io_pool, fetch_url_bytes, items, io_workers * 2)
+            batches = stack.enter_context(SharedBatchPool(processes, batch_size)).iter_batches(loaded)
+        else:
+            cpu_pool = stack.enter_context(ThreadPoolExecutor(cpu_workers, thread_name_prefix="batch-cpu"))
+            loaded = _bounded_map(io_pool, load_image_bytes, items, io_workers * 2)
+            decoded = _bounded_map(cpu_pool, _decode, loaded, max(cpu_workers * 2, batch_size))
+            batches = iter_batches(decoded, batch_size)
+
+        for names, batch, failures in batches:
+            for name, error in failures:
+                writer.write({"source": name, "error": error})
+                counts["failed"] += 1
+            if not names:
+                continue
+
+            for name, row in zip(names, engine(batch)):
+                fruit, confidence = decode_prediction(row, threshold)
+                record = {"source": name, "fruit": fruit, "confidence": round(confidence, 6)}
+                if fruit is not None:
+                    if fruit not in nutrition_by_fruit:
+                        try:
+                            nutrition_by_fruit[fruit] = lookup_nutrition(fruit)
+                        except Exception as e:
+                            print(f"Error looking up nutrition for {fruit}: {e}")
+                            nutrition_by_fruit[fruit] = ({}, 0)
+                    nutrition, volume = nutrition_by_fruit[fruit]
+                    record.update({column: nutrition.get(column) for column in NUTRIENT_COLUMNS})
+                    record["volume"] = volume or None
+                writer.write(record)
+                counts["classified"] += 1
+
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory, .csv/.jsonl manifest or list of paths/URLs")
+    parser.add_argument("--out", required=True, help="Output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="Override the output format")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--cpu-workers", type=int, default=None, help="Default: number of CPUs")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Decode in this many worker processes with shared-memory batches")
+    parser.add_argument("--scrape", action="store_true",
+                        help="Look nutrition up on fatsecret instead of the local store")
+    args = parser.parse_args(argv)
+
+    writer = ResultWriter(args.out, args.format)
+    try:
+        counts = classify_source(
+            args.source, writer, args.batch_size, args.io_workers, args.cpu_workers,
+            lookup_nutrition=scrape_nutrition_data if args.scrape else None,
+            processes=args.processes,
+        )
+    finally:
+        writer.close()
+
+    total = counts["classified"] + counts["failed"]
+    rate = counts["classified"] / counts["seconds"] if counts["seconds"] else 0.0
+    print(f"{counts['classified']} classified, {counts['failed']} failed out of {total} images "
+          f"in {counts['seconds']:.1f}s ({rate:.1f} images/s) -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+In-process TTL cache with stale-while-revalidate, negative caching and
+request coalescing, used around the fatsecret scrapers.
+
+- Fresh entries (younger than ``ttl``) are returned directly.
+- Stale entries (younger than ``ttl + stale_ttl``) are returned immediately
+  while one background thread refreshes them.
+- Failed lookups (exceptions, or results flagged by ``is_negative``) are
+  remembered for ``negative_ttl`` so a broken page is not refetched on every
+  request.
+- Concurrent misses for the same key wait for a single loader call.
+"""
+
+import copy
+import functools
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Entry:
+    __slots__ = ("value", "error", "expires", "stale_until")
+
+    def __init__(self, value, error, expires, stale_until):
+        self.value = value
+        self.error = error
+        self.expires = expires
+        self.stale_until = stale_until
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class TTLCache:
+    """
+    Parameters:
+        - ttl (float): Seconds an entry is served as fresh.
+        - stale_ttl (float): Extra seconds a stale entry is served while refreshing.
+        - negative_ttl (float): Seconds a failed lookup is remembered.
+        - max_entries (int): Oldest entries are dropped past this size.
+        - is_negative (callable): Returns True for results that count as failures.
+    """
+
+    def __init__(self, ttl=3600.0, stale_ttl=86400.0, negative_ttl=60.0,
+                 max_entries=256, is_negative=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.is_negative = is_negative
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0, "coalesced": 0}
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key``, calling ``loader()`` on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires:
+                self.stats["negative_hits" if entry.error is not None else "hits"] += 1
+            elif entry is not None and entry.error is None and now < entry.stale_until:
+                self.stats["stale_hits"] += 1
+            else:
+                entry = None
+                self.stats["misses"] += 1
+
+        if entry is None:
+            return self._load(key, loader)
+        if now >= entry.expires:
+            self._refresh_in_background(key, loader)
+        return entry.result()
+
+    def _load(self, key, loader, background=False):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = Future()
+            elif not background:
+                self.stats["coalesced"] += 1
+        if not leader:
+            return None if background else call.result()
+
+        try:
+            value = loader()
+        except Exception as e:
+            self._store(key, None, e, keep_good=background)
+            call.set_exception(e)
+            raise
+        else:
+            negative = self.is_negative is not None and self.is_negative(value)
+            self._store(key, value, None, negative=negative, keep_good=background and negative)
+            call.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key, value, error, negative=False, keep_good=False):
+        now = time.monotonic()
+        with self._lock:
+            current = self._entries.get(key)
+            if keep_good and current is not None and current.error is None:
+                # A failed background refresh keeps serving the stale value
+                return
+            if error is not None or negative:
+                expires = stale_until = now + self.negative_ttl
+            else:
+                expires = now + self.ttl
+                stale_until = expires + self.stale_ttl
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(value, error, expires, stale_until)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._inflight:
+                return
+
+        def worker():
+            try:
+                self._load(key, loader, background=True)
+            except Exception as e:
+                print(f"Error refreshing cache entry {key!r}: {e}")
+
+        threading.Thread(target=worker, name="cache-refresh", daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(ttl=3600.0, stale_ttl=86400.0, negative_ttl=60.0, max_entries=256, is_negative=None):
+    """
+    Decorator that caches a function's results in a TTLCache keyed by its
+    arguments. Callers receive a deep copy, so mutating a result never
+    changes the cached value. The cache is available as ``func.cache``.
+    """
+    def decorator(func):
+        cache = TTLCache(ttl, stale_ttl, negative_ttl, max_entries, is_negative)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return copy.deepcopy(cache.get_or_load(key, lambda: func(*args, **kwargs)))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
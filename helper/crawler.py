@@ -0,0 +1,265 @@
+"""
+Bulk offline crawler for fatsecret nutrition pages.
+
+Crawls each food slug and all of its portion pages with bounded parallelism
+and one global rate limit. Every finished page is appended to a JSONL
+checkpoint straight away, so an interrupted run picks up where it stopped
+when started again with the same output file.
+
+Usage:
+    python -m helper.crawler apel pisang ceri kiwi --out data/nutrition.jsonl
+    python -m helper.crawler --slugs-file foods.txt --rate 0.5 --workers 4 --parquet data/nutrition.parquet
+    python -m helper.crawler apel --fixtures tests/fixtures/pages --no-portions --out /tmp/apel.jsonl
+    python -m helper.crawler apel --record tests/fixtures/pages --out /tmp/apel.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qs
+
+from . import http_client
+from .parsers import parse_food_page
+from .scrap import FATSECRET_BASE_URL, food_slug
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all worker threads.
+
+    Parameters:
+        - rate (float): Requests per second.
+        - burst (int): Requests allowed back to back after an idle period.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def fixture_name(slug, portion_url=None):
+    """
+    File name of a recorded page: ``apel.html`` or ``apel__58233.html`` for
+    a portion page.
+    """
+    if not portion_url:
+        return f"{slug}.html"
+    portion_id = parse_qs(portion_url.lstrip("?")).get("portionid", ["unknown"])[0]
+    return f"{slug}__{portion_id}.html"
+
+
+def live_fetcher(record_dir=None):
+    """
+    Fetch pages from fatsecret through the shared HTTP client, optionally
+    saving each one as a fixture.
+    """
+    def fetch(slug, portion_url=None):
+        response = http_client.get(FATSECRET_BASE_URL + slug + (portion_url or ""))
+        response.raise_for_status()
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+            with open(os.path.join(record_dir, fixture_name(slug, portion_url)), "wb") as f:
+                f.write(response.content)
+        return response.content
+    return fetch
+
+
+def fixture_fetcher(directory):
+    """
+    Serve pages from recorded fixtures instead of the live site. A page
+    without a fixture raises FileNotFoundError, so it is recorded as failed
+    rather than served another page's values.
+    """
+    def fetch(slug, portion_url=None):
+        path = os.path.join(directory, fixture_name(slug, portion_url))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No fixture {path}")
+        with open(path, "rb") as f:
+            return f.read()
+    return fetch
+
+
+def _task_key(slug, portion_url):
+    return f"{slug}{portion_url or ''}"
+
+
+def load_checkpoint(path):
+    """
+    Read the records already written to ``path``.
+
+    Returns:
+        - dict: Successful records keyed by slug + portion query.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a partial last line
+                continue
+            if not record.get("error"):
+                done[_task_key(record["slug"], record["portion_url"])] = record
+    return done
+
+
+def crawl(slugs, output, fetch, rate=1.0, workers=4, include_portions=True):
+    """
+    Crawl ``slugs`` (and their portion pages) into the JSONL file ``output``.
+
+    Parameters:
+        - slugs (list): Food names or slugs; aliases such as 'ceri' are applied.
+        - fetch (callable): ``fetch(slug, portion_url) -> html``.
+        - rate (float): Global request rate limit per second.
+        - workers (int): Pages fetched in parallel.
+
+    Returns:
+        - dict: Counts of fetched, skipped and failed pages.
+    """
+    done = load_checkpoint(output)
+    limiter = RateLimiter(rate)
+    write_lock = threading.Lock()
+    counts = {"fetched": 0, "skipped": 0, "failed": 0}
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    def scrape(slug, portion_text, portion_url):
+        limiter.acquire()
+        try:
+            page = parse_food_page(fetch(slug, portion_url))
+            record = {
+                "slug": slug,
+                "portion": portion_text,
+                "portion_url": portion_url,
+                "nutrition": page.nutrition,
+                "volume": page.default_volume,
+                "portion_links": page.portion_links,
+                "fetched_at": time.time(),
+                "error": None,
+            }
+        except Exception as e:
+            record = {"slug": slug, "portion": portion_text, "portion_url": portion_url,
+                      "fetched_at": time.time(), "error": str(e)}
+        with write_lock, open(output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def schedule(slug, portion_text, portion_url):
+            key = _task_key(slug, portion_url)
+            if key in done:
+                counts["skipped"] += 1
+                # Resume portions of a page crawled in an earlier run
+                on_record(done[key])
+            else:
+                pending.add(executor.submit(scrape, slug, portion_text, portion_url))
+
+        def on_record(record):
+            if record.get("error"):
+                counts["failed"] += 1
+                print(f"{_task_key(record['slug'], record['portion_url'])}: {record['error']}")
+                return
+            if include_portions and record["portion_url"] is None:
+                for text, url in record["portion_links"].items():
+                    schedule(record["slug"], text, url)
+
+        for slug in dict.fromkeys(food_slug(name) for name in slugs):
+            schedule(slug, None, None)
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                if not record.get("error"):
+                    counts["fetched"] += 1
+                on_record(record)
+
+    return counts
+
+
+def write_parquet(jsonl_path, parquet_path):
+    """
+    Convert the successful records of a crawl into a flat Parquet table.
+    """
+    import pandas as pd
+
+    rows = []
+    for record in load_checkpoint(jsonl_path).values():
+        row = {"slug": record["slug"], "portion": record["portion"], "portion_url": record["portion_url"],
+               "volume": str(record["volume"]), "fetched_at": record["fetched_at"]}
+        row.update(record["nutrition"])
+        rows.append(row)
+    pd.DataFrame(rows).to_parquet(parquet_path, index=False)
+
+
+def positive_float(value):
+    """
+    argparse type for a float greater than zero.
+    """
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("slugs", nargs="*", help="Food names or fatsecret slugs")
+    parser.add_argument("--slugs-file", help="File with one food name or slug per line")
+    parser.add_argument("--out", default="data/nutrition.jsonl", help="JSONL checkpoint and result file")
+    parser.add_argument("--parquet", help="Also write the results to this Parquet file")
+    parser.add_argument("--rate", type=positive_float, default=1.0, help="Requests per second across all workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-portions", action="store_true", help="Only crawl each food's main page")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fixtures", help="Read recorded pages from this folder instead of the live site")
+    source.add_argument("--record", help="Save every fetched page into this folder as a fixture")
+    args = parser.parse_args(argv)
+
+    slugs = list(args.slugs)
+    if args.slugs_file:
+        with open(args.slugs_file, encoding="utf-8") as f:
+            slugs += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not slugs:
+        parser.error("no food slugs given")
+
+    fetch = fixture_fetcher(args.fixtures) if args.fixtures else live_fetcher(args.record)
+    start = time.perf_counter()
+    counts = crawl(slugs, args.out, fetch, args.rate, args.workers, not args.no_portions)
+    print(f"{counts['fetched']} fetched, {counts['skipped']} already done, {counts['failed']} failed "
+          f"in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+        print(f"Parquet written to {args.parquet}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Inference engines for the fruit classifier.
+
+Keras ``model.predict`` builds a data adapter, callbacks and a progress bar on
+every call, which costs more than the forward pass for a single 224x224 image.
+``KerasEngine`` traces the model once into a graph with a fixed input
+signature and calls it directly.
+
+``TFLiteEngine`` and ``OnnxEngine`` run a model exported with
+``python -m helper.export`` and do not need the full TensorFlow runtime when
+``tflite_runtime`` or ``onnxruntime`` is installed.
+
+Every engine is called with a float32 array of shape (N, 224, 224, 3) and
+returns the class probabilities as a NumPy array of shape (N, num_classes).
+"""
+
+import threading
+
+import numpy as np
+
+INPUT_SHAPE = (224, 224, 3)
+
+
+class _Engine:
+    name = None
+
+    def __call__(self, batch):
+        raise NotImplementedError
+
+    def warm_up(self, batch_size=1):
+        """
+        Run one dummy forward pass so the first request does not pay for
+        graph tracing or tensor allocation.
+        """
+        self(np.zeros((batch_size,) + INPUT_SHAPE, dtype=np.float32))
+
+
+class KerasEngine(_Engine):
+    """
+    Graph-mode wrapper around a loaded Keras model.
+    """
+
+    name = "keras"
+
+    def __init__(self, model, num_threads=None):
+        import tensorflow as tf
+
+        if num_threads:
+            # Only takes effect before TensorFlow has run its first op
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            except RuntimeError:
+                pass
+
+        self.model = model
+        self._forward = tf.function(
+            lambda batch: model(batch, training=False),
+            input_signature=[tf.TensorSpec(shape=(None,) + INPUT_SHAPE, dtype=tf.float32)],
+        )
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return np.asarray(self._forward(batch))
+
+
+class TFLiteEngine(_Engine):
+    """
+    Runs an exported ``.tflite`` model, preferring the small ``tflite_runtime``
+    package over full TensorFlow.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self._interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self._input_index = self._interpreter.get_input_details()[0]["index"]
+        self._output_index = self._interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        # The interpreter holds mutable tensors and is not thread-safe
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input_index, batch.shape)
+                self._interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self._interpreter.set_tensor(self._input_index, batch)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
+
+
+class OnnxEngine(_Engine):
+    """
+    Runs an exported ``.onnx`` model on the ONNX Runtime CPU provider.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.model_path = model_path
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self._session.run(None, {self._input_name: batch})[0]
@@ -0,0 +1,124 @@
+"""
+Export model/model.pkl for the CPU backends and check that they agree with
+the Keras model.
+
+Usage:
+    python -m helper.export --format tflite onnx --check-parity
+    python -m helper.export --format tflite --check-parity --images samples/
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from .engine import INPUT_SHAPE, KerasEngine, OnnxEngine, TFLiteEngine
+from .functions import preprocess_image
+from .model_registry import ONNX_MODEL_PATH, TFLITE_VARIANT_PATHS, get_model
+
+# Maximum absolute difference allowed between Keras and exported probabilities
+DEFAULT_TOLERANCE = 1e-4
+
+
+def export_tflite(model, path=TFLITE_VARIANT_PATHS["fp32"]):
+    """
+    Convert the Keras model to a float32 TFLite flatbuffer.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def export_onnx(model, path=ONNX_MODEL_PATH, opset=13):
+    """
+    Convert the Keras model to ONNX. Requires ``tf2onnx``.
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    signature = (tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=path)
+    return path
+
+
+def load_parity_batch(images_dir=None, count=16, seed=0):
+    """
+    Build the batch used for parity checks: preprocessed images from
+    ``images_dir`` when given, random pixels otherwise.
+    """
+    if images_dir:
+        names = sorted(os.listdir(images_dir))
+        arrays = []
+        for name in names:
+            with open(os.path.join(images_dir, name), "rb") as f:
+                try:
+                    arrays.append(preprocess_image(f.read()))
+                except Exception:
+                    continue
+            if len(arrays) == count:
+                break
+        if arrays:
+            return np.concatenate(arrays, axis=0).astype(np.float32)
+    rng = np.random.default_rng(seed)
+    return rng.random((count,) + INPUT_SHAPE, dtype=np.float32)
+
+
+def check_parity(reference, candidate, batch, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare two engines on the same batch.
+
+    Returns:
+        - dict: ``max_abs_diff``, ``top1_agreement`` and ``passed``.
+    """
+    expected = reference(batch)
+    actual = candidate(batch)
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    top1_agreement = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    return {
+        "max_abs_diff": max_abs_diff,
+        "top1_agreement": top1_agreement,
+        "passed": max_abs_diff <= tolerance and top1_agreement == 1.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", nargs="+", choices=["tflite", "onnx"], default=["tflite"])
+    # Always the fp32 file: MODEL_VARIANT must not point an export at a quantized model
+    parser.add_argument("--tflite-path", default=TFLITE_VARIANT_PATHS["fp32"])
+    parser.add_argument("--onnx-path", default=ONNX_MODEL_PATH)
+    parser.add_argument("--check-parity", action="store_true", help="Compare exported models with Keras")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--images", help="Folder of sample images for the parity check")
+    args = parser.parse_args(argv)
+
+    model = get_model()
+    candidates = []
+    if "tflite" in args.format:
+        print(f"Exported {export_tflite(model, args.tflite_path)}")
+        candidates.append(("tflite", lambda: TFLiteEngine(args.tflite_path)))
+    if "onnx" in args.format:
+        print(f"Exported {export_onnx(model, args.onnx_path)}")
+        candidates.append(("onnx", lambda: OnnxEngine(args.onnx_path)))
+
+    if not args.check_parity:
+        return 0
+
+    reference = KerasEngine(model)
+    batch = load_parity_batch(args.images)
+    failed = False
+    for name, build in candidates:
+        result = check_parity(reference, build(), batch, args.tolerance)
+        status = "OK" if result["passed"] else "FAILED"
+        print(f"{name}: max |diff| = {result['max_abs_diff']:.2e}, "
+              f"top-1 agreement = {result['top1_agreement']:.2%} [{status}]")
+        failed = failed or not result["passed"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
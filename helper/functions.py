@@ -1,8 +1,31 @@
-import requests
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageFile
+import asyncio
 import io
+import mmap
 import os
+import time
+
+from typing import NamedTuple, Optional
+
+from urllib3.exceptions import ReadTimeoutError
+
+from . import http_client
+from .metrics import timed
+
+# Limits for images downloaded by URL
+IMAGE_MAX_BYTES = int(os.environ.get("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_DOWNLOAD_DEADLINE = float(os.environ.get("IMAGE_DOWNLOAD_DEADLINE", "30"))
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Magic bytes of the formats the classifier accepts
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+)
 
 # conver to gram
 def convert_weight_to_grams(weight):
@@ -48,37 +71,305 @@ def safe_convert(value, unit):
     except (ValueError, AttributeError):
         return 0.0  
 
+def sniff_image_format(data):
+    """
+    Identify an image from its first bytes.
+
+    Returns:
+        - str: "JPEG", "PNG", "GIF", "BMP" or "WEBP", or None if unknown.
+    """
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return None
+
+
+class ImageDecodeError(ValueError):
+    """
+    Raised when PIL cannot decode an image: unknown format, truncated file
+    or decompression bomb.
+    """
+
+
+# Raised by PIL for data it cannot decode (OSError covers truncated files)
+_PIL_DECODE_ERRORS = (OSError, Image.DecompressionBombError)
+
+
+class FetchedImage(NamedTuple):
+    data: bytes
+    format: str
+    image: Optional[Image.Image]
+
+
+def _iter_body(response, chunk_size, deadline_at):
+    """
+    Yield the decoded response body as it arrives, at most ``chunk_size``
+    bytes at a time, and raise once ``deadline_at`` (a ``time.monotonic()``
+    value) has passed.
+
+    ``read1`` returns whatever one socket read delivers instead of waiting
+    for a full chunk, and undoes any gzip/deflate/br content encoding. The
+    deadline is checked between chunks; a single read is bounded by the
+    request's read timeout.
+    """
+    while True:
+        if time.monotonic() >= deadline_at:
+            raise ValueError("Image download took too long.")
+        try:
+            chunk = response.raw.read1(chunk_size, decode_content=True)
+        except ReadTimeoutError:
+            if time.monotonic() >= deadline_at:
+                raise ValueError("Image download took too long.")
+            raise
+        if not chunk:
+            return
+        yield chunk
+
+
+@timed("fetch_image")
+def fetch_image(url, max_bytes=IMAGE_MAX_BYTES, deadline=IMAGE_DOWNLOAD_DEADLINE,
+                chunk_size=IMAGE_CHUNK_SIZE, decode=False):
+    """
+    Stream an image from a URL in chunks.
+
+    The download is aborted as soon as it exceeds ``max_bytes``, takes longer
+    than ``deadline`` seconds in total, or starts with bytes that are not a
+    known image format. With ``decode`` set the image is also decoded
+    incrementally as it arrives; leave it off when the bytes are decoded
+    later anyway.
+
+    Returns:
+        - FetchedImage: Raw bytes, sniffed format and the decoded PIL image,
+          or None for the image when ``decode`` is off.
+    """
+    deadline_at = time.monotonic() + deadline
+    # No single read may wait longer than the whole download is allowed to take
+    connect_timeout, read_timeout = http_client.DEFAULT_TIMEOUT
+    timeout = (connect_timeout, min(read_timeout, deadline))
+    with http_client.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(f"Image is larger than {max_bytes} bytes.")
+
+        parser = ImageFile.Parser() if decode else None
+        buffer = bytearray()
+        image_format = None
+        for chunk in _iter_body(response, chunk_size, deadline_at):
+            buffer += chunk
+            if len(buffer) > max_bytes:
+                raise ValueError(f"Image is larger than {max_bytes} bytes.")
+            if image_format is None and len(buffer) >= 12:
+                image_format = sniff_image_format(buffer)
+                if image_format is None:
+                    raise ValueError("URL is not an image.")
+            if parser is not None:
+                parser.feed(chunk)
+
+    if image_format is None:
+        image_format = sniff_image_format(buffer)
+        if image_format is None:
+            raise ValueError("URL is not an image.")
+    image = None
+    if parser is not None:
+        try:
+            image = parser.close()
+        except _PIL_DECODE_ERRORS as e:
+            raise ImageDecodeError("Image could not be decoded.") from e
+    return FetchedImage(bytes(buffer), image_format, image)
+
+
 def get_image_from_url(url):
     """
     Download image from URL and return as bytes
     """
     try:
-        response = requests.get(url, stream=True, timeout=10)
-        response.raise_for_status()
-        if not response.headers.get("Content-Type", "").startswith("image/"):
-            raise ValueError("URL is not an image.")
-        return response.content
+        return fetch_image(url).data
     except Exception as e:
         raise ValueError(f"Failed to download image from URL: {str(e)}")
-    
+
+
+async def fetch_images_async(urls, max_concurrency=8, **kwargs):
+    """
+    Download many images concurrently, e.g. for batch classification.
+
+    Returns:
+        - list: A FetchedImage or the raised exception for each URL, in order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(url):
+        async with semaphore:
+            return await asyncio.to_thread(fetch_image, url, **kwargs)
+
+    return await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
 def get_image_from_path(path):
     """
-    Read image from local file path
+    Read image from local file path and return as bytes
     """
     try:
-        if not os.path.exists(path):
-            raise ValueError("File not found.")
         with open(path, "rb") as f:
-            return f.read()
+            data = f.read()
+    except FileNotFoundError:
+        raise ValueError("Failed to read image from path: File not found.")
     except Exception as e:
         raise ValueError(f"Failed to read image from path: {str(e)}")
-    
+    if not data:
+        raise ValueError("Failed to read image from path: File is empty.")
+    return data
+
+
+def open_image_mmap(path):
+    """
+    Memory-map a local image instead of copying it into a bytes object.
+
+    The returned read-only mmap is bytes-like and can be passed to
+    ``preprocess_image`` or ``decode_image``. The caller owns it and must
+    close it, e.g. with ``with open_image_mmap(path) as image: ...``.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("File is empty.")
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise ValueError("Failed to read image from path: File not found.")
+    except Exception as e:
+        raise ValueError(f"Failed to read image from path: {str(e)}")
+
+
+def _image_stream(image_bytes):
+    """
+    Wrap encoded image data for PIL.
+    """
+    if isinstance(image_bytes, mmap.mmap):
+        # A private stream: the mmap's own file position may be shared by threads
+        return io.BytesIO(memoryview(image_bytes))
+    return io.BytesIO(image_bytes)
+
+
+@timed("decode")
+def decode_image(image_bytes, target_size=(224, 224), preview_size=None, draft=False):
+    """
+    Decode an image once and resize it for the model and, optionally, a preview.
+
+    With ``draft`` enabled, JPEGs are downscaled by libjpeg in the DCT domain
+    (by 1/2, 1/4 or 1/8) to the smallest size that still covers both targets,
+    so a 12 MP photo is never fully decoded. Other formats decode as usual.
+    Draft decoding changes pixel values slightly (up to a few /255), so it is
+    off by default and model inputs match a full decode.
+
+    Parameters:
+        - image_bytes (bytes or mmap): Encoded image.
+        - target_size (tuple): (width, height) of the model input.
+        - preview_size (tuple): (width, height) of the preview, or None.
+        - draft (bool): Use JPEG draft mode.
+
+    Returns:
+        - tuple: (model-sized RGB image, preview RGB image or None)
+
+    Raises:
+        - ImageDecodeError: PIL cannot decode ``image_bytes``.
+    """
+    try:
+        image = Image.open(_image_stream(image_bytes))
+        if draft:
+            needed = target_size
+            if preview_size:
+                needed = (max(target_size[0], preview_size[0]), max(target_size[1], preview_size[1]))
+            image.draft("RGB", needed)
+        image = image.convert("RGB")
+    except _PIL_DECODE_ERRORS as e:
+        raise ImageDecodeError("Image could not be decoded.") from e
+
+    model_image = image.resize(target_size)
+    preview = image.resize(preview_size) if preview_size else None
+    return model_image, preview
+
+
 # Function to preprocess image for the model
+def preprocess_into(image_bytes, out, target_size=(224, 224), draft=False):
+    """
+    Decode, resize and normalize one image straight into ``out``.
+
+    Parameters:
+        - image_bytes (bytes): Encoded image.
+        - out (np.ndarray): float32 array of shape (height, width, 3), filled in place.
+        - target_size (tuple): (width, height) passed to PIL.
+        - draft (bool): Use JPEG draft mode, see ``decode_image``.
+
+    Returns:
+        - np.ndarray: ``out``
+    """
+    image, _ = decode_image(image_bytes, target_size, draft=draft)
+    return normalize_into(image, out)
+
+
+@timed("normalize")
+def normalize_into(image, out):
+    """
+    Scale an RGB PIL image to [0, 1] float32 inside ``out``.
+    """
+    # Dividing in float32 avoids the float64 temporary of ``array / 255.0``
+    np.divide(np.asarray(image), np.float32(255.0), out=out, dtype=np.float32)
+    return out
+
+
+def load_preview(image_bytes, preview_size=(200, 200)):
+    """
+    Decode a display-only preview, in JPEG draft mode. Never use it as a
+    model input: draft decoding does not match a full decode.
+    """
+    preview, _ = decode_image(image_bytes, preview_size, draft=True)
+    return preview
+
+
+def load_image(image_bytes, target_size=(224, 224), preview_size=(200, 200)):
+    """
+    Build both the model input and a display preview from a single full decode.
+
+    Returns:
+        - tuple: (float32 array of shape (1, height, width, 3), preview PIL image)
+    """
+    image, preview = decode_image(image_bytes, target_size, preview_size)
+    out = np.empty((1, target_size[1], target_size[0], 3), dtype=np.float32)
+    normalize_into(image, out[0])
+    return out, preview
+
+
+@timed("preprocess")
 def preprocess_image(image_bytes, target_size=(224, 224)):
     """
     Preprocess image bytes for the model
+
+    Returns:
+        - np.ndarray: float32 array of shape (1, height, width, 3) in [0, 1].
+    """
+    out = np.empty((1, target_size[1], target_size[0], 3), dtype=np.float32)
+    preprocess_into(image_bytes, out[0], target_size)
+    return out
+
+
+def preprocess_batch(images, target_size=(224, 224), out=None):
+    """
+    Preprocess many images into one (N, height, width, 3) float32 array.
+
+    Parameters:
+        - images (list): Encoded images.
+        - out (np.ndarray): Optional preallocated buffer with at least N rows.
+
+    Returns:
+        - np.ndarray: The first N rows of ``out``.
     """
-    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    image = image.resize(target_size)
-    array = np.array(image) / 255.0
-    return np.expand_dims(array, axis=0)
\ No newline at end of file
+    count = len(images)
+    if out is None:
+        out = np.empty((count, target_size[1], target_size[0], 3), dtype=np.float32)
+    elif out.shape[0] < count:
+        raise ValueError("Output buffer is smaller than the batch.")
+    for i, image_bytes in enumerate(images):
+        preprocess_into(image_bytes, out[i], target_size)
+    return out[:count]
@@ -0,0 +1,108 @@
+"""
+Shared HTTP client for the scrapers and image downloads.
+
+One ``requests.Session`` is reused by the whole process, so repeated requests
+to fatsecret.co.id reuse keep-alive connections instead of paying for a new
+TCP and TLS handshake each time. Every request gets connect and read timeouts,
+and idempotent requests are retried with exponential backoff and jitter.
+
+Settings come from the environment:
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT   seconds (3.05, 10)
+    HTTP_RETRIES, HTTP_BACKOFF, HTTP_JITTER   retry count and backoff (3, 0.5, 0.25)
+    HTTP_POOL_HOSTS                           hosts kept in the pool (10)
+    HTTP_POOL_MAXSIZE                         connections kept per host (10)
+    HTTP_POOL_BLOCK                           "1" to wait for a free connection
+                                              instead of opening extra ones
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", "0.5"))
+HTTP_JITTER = float(os.environ.get("HTTP_JITTER", "0.25"))
+HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))
+HTTP_POOL_BLOCK = os.environ.get("HTTP_POOL_BLOCK", "0") == "1"
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+USER_AGENT = "Mozilla/5.0 (compatible; Klasifikasi-Buah/1.0)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, jitter=HTTP_JITTER,
+                  pool_hosts=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=HTTP_POOL_BLOCK):
+    """
+    Create a Session with a retrying, pooled adapter for http and https.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        backoff_factor=backoff,
+        backoff_jitter=jitter,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Return the process-wide Session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    ``requests.get`` through the shared session, with default timeouts.
+    """
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def http_stats(session=None):
+    """
+    Report connection reuse per host.
+
+    Returns:
+        - dict: ``{host: {"connections": opened, "requests": sent, "reused": requests - connections}}``
+    """
+    session = session or get_session()
+    stats = {}
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {"connections": 0, "requests": 0, "reused": 0})
+            entry["connections"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+            entry["reused"] = max(entry["requests"] - entry["connections"], 0)
+    return stats
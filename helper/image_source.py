@@ -0,0 +1,55 @@
+"""
+Lazy local image source for classifying whole folders from disk.
+
+Directories are walked with ``os.scandir`` and files are memory-mapped with
+``open_image_mmap``, one at a time, so memory use stays flat however
+many images a folder holds.
+"""
+
+import os
+
+from .functions import open_image_mmap, sniff_image_format
+
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"})
+
+
+def iter_image_paths(root, extensions=IMAGE_EXTENSIONS, recursive=True):
+    """
+    Yield paths under ``root`` whose extension is in ``extensions``, in
+    sorted order within each directory.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    subdirectories.append(entry.path)
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                yield entry.path
+        # Reversed so directories are visited in sorted order
+        stack.extend(reversed(subdirectories))
+
+
+def iter_images(root, extensions=IMAGE_EXTENSIONS, recursive=True, check_magic=True):
+    """
+    Yield ``(path, image)`` for every image under ``root``.
+
+    ``image`` is a read-only mmap of the file that ``preprocess_image`` and
+    ``decode_image`` read without copying. It is closed when the next image
+    is requested, so take ``bytes(image)`` to keep the data. Files whose
+    first bytes are not a known image format are skipped when
+    ``check_magic`` is set, as are files that cannot be opened.
+    """
+    for path in iter_image_paths(root, extensions, recursive):
+        try:
+            image = open_image_mmap(path)
+        except ValueError:
+            continue
+        with image:
+            if check_magic and sniff_image_format(image) is None:
+                continue
+            yield path, image
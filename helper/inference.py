@@ -0,0 +1,188 @@
+"""
+Batched inference for the fruit classifier.
+
+``classify_batch`` runs many images through one forward pass, and
+``MicroBatcher`` groups single-image requests coming from concurrent
+Streamlit sessions into such batches in a background thread.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from .functions import preprocess_batch, preprocess_image
+from .metrics import attach, current_request, timed
+from .model_registry import get_engine
+
+fruits_list = ['Apel', 'Pisang', 'Alpukat', 'Ceri', 'Kiwi', 'Mangga', 'Jeruk', 'Nanas', 'Stroberi', 'Semangka']
+
+# If prediction confidence is below this, no fruit is reported
+CONFIDENCE_THRESHOLD = 0.6
+
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "16"))
+MAX_WAIT_MS = float(os.environ.get("MAX_WAIT_MS", "5"))
+
+
+@timed("forward")
+def predict_batch(batch):
+    """
+    Run one forward pass over a preprocessed (N, 224, 224, 3) batch.
+
+    Returns:
+        - np.ndarray: Class probabilities with shape (N, num_classes).
+    """
+    return get_engine()(batch)
+
+
+def decode_prediction(probabilities, threshold=CONFIDENCE_THRESHOLD):
+    """
+    Turn one row of class probabilities into ``(fruit_name, confidence)``.
+    ``fruit_name`` is None when the confidence is below ``threshold``.
+    """
+    pred_idx = int(np.argmax(probabilities))
+    confidence = float(probabilities[pred_idx])
+
+    if confidence < threshold:
+        return None, confidence
+
+    fruit_name = fruits_list[pred_idx] if pred_idx < len(fruits_list) else None
+    return fruit_name, confidence
+
+
+def classify_batch(images, threshold=CONFIDENCE_THRESHOLD):
+    """
+    Classify several images with a single forward pass.
+
+    Parameters:
+        - images (list): Raw image bytes, one entry per image.
+        - threshold (float): Minimum confidence for a fruit to be reported.
+
+    Returns:
+        - list: ``(fruit_name, confidence)`` tuples in the same order as ``images``.
+    """
+    if not images:
+        return []
+    batch = preprocess_batch(images)
+    predictions = predict_batch(batch)
+    return [decode_prediction(row, threshold) for row in predictions]
+
+
+class MicroBatcher:
+    """
+    Collect single-image requests from many threads and run them together.
+
+    A request waits at most ``max_wait_ms`` for others to join its batch, and a
+    batch never grows past ``max_batch_size``. Preprocessing happens in the
+    caller's thread so only the forward pass is serialized. The forward pass
+    is recorded in the metrics request of every caller in the batch.
+    """
+
+    def __init__(self, predict_fn=predict_batch, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait_ms=MAX_WAIT_MS, threshold=CONFIDENCE_THRESHOLD):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self._queue = queue.Queue()
+        self._closed = False
+        # Held while checking _closed and enqueuing, so nothing lands after the stop marker
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image_bytes, image_array=None):
+        """
+        Queue one image for classification.
+
+        Parameters:
+            - image_bytes (bytes): Encoded image.
+            - image_array (np.ndarray): Already preprocessed (1, 224, 224, 3)
+              input, e.g. from ``load_image``; skips decoding ``image_bytes``.
+
+        Returns:
+            - Future: Resolves to ``(fruit_name, confidence)``.
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+        array = image_array if image_array is not None else preprocess_image(image_bytes)
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed.")
+            self._queue.put((array, future, current_request()))
+        return future
+
+    def classify(self, image_bytes, image_array=None, timeout=None):
+        """
+        Classify one image, blocking until its batch has run.
+        """
+        return self.submit(image_bytes, image_array).result(timeout=timeout)
+
+    def close(self):
+        """
+        Stop the background thread after pending requests are served.
+        """
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        items = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the stop marker so the main loop sees it
+                self._queue.put(None)
+                break
+            items.append(item)
+        return items
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items = [item for item in self._collect(first)
+                     if item[1].set_running_or_notify_cancel()]
+            if not items:
+                continue
+            try:
+                batch = np.concatenate([array for array, _, _ in items], axis=0)
+                with attach(context for _, _, context in items):
+                    predictions = self.predict_fn(batch)
+            except Exception as e:
+                for _, future, _ in items:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), row in zip(items, predictions):
+                future.set_result(decode_prediction(row, self.threshold))
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """
+    Return the process-wide MicroBatcher, starting it on first use.
+    """
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher()
+    return _batcher
@@ -0,0 +1,325 @@
+"""
+Per-stage timing for the classify flow, exported in Prometheus text format.
+
+Wrap a stage in ``with span("decode"):`` or decorate a function with
+``@timed("forward")``. Durations go into latency histograms, one set per
+thread. Each thread only writes to its own counters, so recording takes no
+lock. The exporter sums every thread's histograms when it is scraped. When a
+thread exits, its histograms are merged into a shared total, so short-lived
+threads do not pile up.
+
+``with request("analyze"):`` groups the spans recorded by the current thread
+and logs one JSON line per request with the time spent in each stage, at
+INFO on the ``helper.metrics`` logger (``METRICS_LOG_REQUESTS=0`` turns it
+off).
+Work handed to another thread is included by passing ``current_request()``
+along and recording under ``attach(...)`` there.
+
+Metrics are off unless ``METRICS_ENABLED=1`` or ``METRICS_PORT`` is set.
+While off, ``span`` returns a shared no-op context manager and ``timed``
+wrappers call straight through, which costs one flag check per call.
+
+Usage:
+    METRICS_PORT=9108 streamlit run app.py
+    curl localhost:9108/metrics
+
+The request lines only show up once logging is configured, e.g. with
+``logging.basicConfig(level=logging.INFO)``.
+"""
+
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1" if METRICS_PORT else "0") == "1"
+METRICS_LOG_REQUESTS = os.environ.get("METRICS_LOG_REQUESTS", "1") == "1"
+METRIC_NAME = "calorie_track_stage_seconds"
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from sub-millisecond decodes to slow scrapes
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = METRICS_ENABLED
+_local = threading.local()
+# One {stage: _Histogram} dict per live thread that has recorded anything
+_thread_histograms = []
+# Histograms of threads that have exited
+_retired = {}
+# Reentrant: a thread's finalizer may run while the lock is held
+_registry_lock = threading.RLock()
+_server = None
+_NOOP = contextlib.nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+
+def enable(enabled=True):
+    """
+    Turn recording on or off at runtime.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+class _ThreadOwner:
+    """
+    Held only by a thread's local storage, so it is freed when the thread
+    exits and its finalizer retires that thread's histograms.
+    """
+
+
+def _retire(histograms):
+    with _registry_lock:
+        for stage, histogram in histograms.items():
+            _retired.setdefault(stage, _Histogram()).merge(histogram)
+        _thread_histograms.remove(histograms)
+
+
+def _histograms():
+    histograms = getattr(_local, "histograms", None)
+    if histograms is None:
+        histograms = _local.histograms = {}
+        with _registry_lock:
+            _thread_histograms.append(histograms)
+        _local.owner = _ThreadOwner()
+        weakref.finalize(_local.owner, _retire, histograms)
+    return histograms
+
+
+def observe(stage, seconds):
+    """
+    Record ``seconds`` spent in ``stage`` for the current thread.
+    """
+    if not _enabled:
+        return
+    histograms = _histograms()
+    histogram = histograms.get(stage)
+    if histogram is None:
+        histogram = histograms[stage] = _Histogram()
+    histogram.observe(seconds)
+
+    for stages in getattr(_local, "request", None) or ():
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.start)
+
+
+def span(stage):
+    """
+    Context manager that times its body as ``stage``.
+    """
+    return _Span(stage) if _enabled else _NOOP
+
+
+def timed(stage):
+    """
+    Decorator that times every call of the function as ``stage``.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def request(name, **fields):
+    """
+    Time one user request as stage ``name`` and log a structured JSON line
+    with the total and the per-stage times recorded inside it, on this
+    thread or under ``attach``. Extra keyword arguments are added to the log
+    line; the yielded dict takes more fields while the request runs.
+    """
+    if not _enabled:
+        yield fields
+        return
+
+    outer = getattr(_local, "request", None)
+    stages = {}
+    _local.request = (stages,)
+    error = None
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        total = time.perf_counter() - start
+        _local.request = outer
+        observe(name, total)
+        if METRICS_LOG_REQUESTS and logger.isEnabledFor(logging.INFO):
+            record = {
+                "event": "request",
+                "name": name,
+                "request_id": uuid.uuid4().hex[:12],
+                "total_ms": round(total * 1000, 3),
+                "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+                "error": error,
+                **fields,
+            }
+            logger.info(json.dumps(record))
+
+
+def current_request():
+    """
+    Return the request this thread is recording into, or None. Hand it to
+    ``attach`` on the thread that does part of the work.
+    """
+    return getattr(_local, "request", None) if _enabled else None
+
+
+@contextlib.contextmanager
+def attach(contexts):
+    """
+    Also record this thread's spans into every request in ``contexts``
+    (values of ``current_request()``; None entries are ignored), e.g. a
+    batched forward pass shared by several requests.
+    """
+    if not _enabled:
+        yield
+        return
+    outer = getattr(_local, "request", None)
+    _local.request = tuple(stages for context in contexts if context for stages in context)
+    try:
+        yield
+    finally:
+        _local.request = outer
+
+
+def snapshot():
+    """
+    Merge every thread's histograms.
+
+    Returns:
+        - dict: ``{stage: {"counts": [...], "sum": float, "count": int}}``,
+          where ``counts`` are per-bucket (not cumulative) with +Inf last.
+    """
+    merged = {}
+    with _registry_lock:
+        for histograms in [_retired] + _thread_histograms:
+            # list() copies in one step, so a thread adding a stage cannot break the loop
+            for stage, histogram in list(histograms.items()):
+                merged.setdefault(stage, _Histogram()).merge(histogram)
+    return {
+        stage: {"counts": histogram.counts, "sum": histogram.sum, "count": histogram.count}
+        for stage, histogram in merged.items()
+    }
+
+
+def reset():
+    """
+    Forget everything recorded so far.
+    """
+    with _registry_lock:
+        _retired.clear()
+        for histograms in _thread_histograms:
+            histograms.clear()
+
+
+def render_prometheus():
+    """
+    Return all histograms in the Prometheus text exposition format.
+    """
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each stage of the classify flow.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for stage, histogram in sorted(snapshot().items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram["counts"]):
+            cumulative += count
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {histogram["sum"]:.9f}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {histogram["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app log
+        pass
+
+
+def start_http_server(port=None, address="127.0.0.1"):
+    """
+    Serve ``/metrics`` on a daemon thread. Safe to call on every Streamlit
+    rerun; only the first call binds the port.
+
+    Parameters:
+        - port (int): Defaults to METRICS_PORT; nothing is started if it is 0.
+
+    Returns:
+        - ThreadingHTTPServer or None
+    """
+    global _server
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    with _registry_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((address, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return _server
@@ -0,0 +1,205 @@
+"""
+Process-wide registry for the fruit classifier.
+
+Streamlit re-executes app.py on every interaction, but imported modules stay
+cached in ``sys.modules``.  Keeping the model here means it is unpickled once
+per process and shared by every session and thread.
+
+The backend is chosen at startup with ``INFERENCE_BACKEND`` (``keras``,
+``tflite`` or ``onnx``) and ``INFERENCE_THREADS``. Only the ``keras`` backend
+unpickles model/model.pkl; the others load an exported file instead.
+``MODEL_VARIANT`` (``fp32``, ``fp16`` or ``int8``) selects one of the TFLite
+files written by ``python -m helper.quantize``.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from .engine import KerasEngine, OnnxEngine, TFLiteEngine
+
+TFLITE_VARIANT_PATHS = {
+    "fp32": "model/model.tflite",
+    "fp16": "model/model_fp16.tflite",
+    "int8": "model/model_int8.tflite",
+}
+
+MODEL_PATH = os.environ.get("MODEL_PATH", "model/model.pkl")
+MODEL_VARIANT = os.environ.get("MODEL_VARIANT", "fp32").lower()
+if MODEL_VARIANT not in TFLITE_VARIANT_PATHS:
+    raise ValueError(f"Unknown model variant: {MODEL_VARIANT}")
+TFLITE_MODEL_PATH = os.environ.get("TFLITE_MODEL_PATH", TFLITE_VARIANT_PATHS[MODEL_VARIANT])
+ONNX_MODEL_PATH = os.environ.get("ONNX_MODEL_PATH", "model/model.onnx")
+# Quantized variants only exist as TFLite files
+BACKEND = os.environ.get("INFERENCE_BACKEND", "keras" if MODEL_VARIANT == "fp32" else "tflite").lower()
+NUM_THREADS = int(os.environ.get("INFERENCE_THREADS", "0")) or None
+
+# Re-entrant because get_engine() may call get_model() while holding it
+_lock = threading.RLock()
+_model = None
+_engine = None
+_checksum = None
+_warm_up_thread = None
+_stats = {
+    "backend": BACKEND,
+    "variant": MODEL_VARIANT,
+    "path": MODEL_PATH,
+    "loaded": False,
+    "load_seconds": None,
+    "rss_before_bytes": None,
+    "rss_after_bytes": None,
+    "engine_seconds": None,
+    "warmed_up": False,
+    "warmup_seconds": None,
+}
+
+
+def _current_rss_bytes():
+    """
+    Return the resident set size of this process in bytes, or None if unknown.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+def get_model():
+    """
+    Return the shared classifier, loading it on first use.
+
+    Returns:
+        - object: The unpickled Keras model from MODEL_PATH.
+    """
+    global _model
+    if _model is not None:
+        return _model
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        if _model is None:
+            _stats["rss_before_bytes"] = _current_rss_bytes()
+            start = time.perf_counter()
+            with open(MODEL_PATH, "rb") as f:
+                model = pickle.load(f)
+            _stats["load_seconds"] = time.perf_counter() - start
+            _stats["rss_after_bytes"] = _current_rss_bytes()
+            _stats["loaded"] = True
+            _model = model
+    return _model
+
+
+def model_path(backend=BACKEND):
+    """
+    Return the model file the given backend loads.
+    """
+    paths = {"keras": MODEL_PATH, "tflite": TFLITE_MODEL_PATH, "onnx": ONNX_MODEL_PATH}
+    if backend not in paths:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    return paths[backend]
+
+
+def model_checksum():
+    """
+    Return the SHA-256 of the active model file, computed once per process.
+    Caches of predictions use it to notice when the model has changed.
+    """
+    global _checksum
+    if _checksum is None:
+        digest = hashlib.sha256()
+        with open(model_path(), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _checksum = f"{BACKEND}:{MODEL_VARIANT}:{digest.hexdigest()}"
+    return _checksum
+
+
+def _build_engine(backend):
+    _stats["path"] = model_path(backend)
+    if backend == "keras":
+        return KerasEngine(get_model(), num_threads=NUM_THREADS)
+    if backend == "tflite":
+        return TFLiteEngine(TFLITE_MODEL_PATH, num_threads=NUM_THREADS)
+    return OnnxEngine(ONNX_MODEL_PATH, num_threads=NUM_THREADS)
+
+
+def get_engine():
+    """
+    Return the shared inference engine for the configured backend, creating
+    it on first use.
+
+    Returns:
+        - KerasEngine, TFLiteEngine or OnnxEngine
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _lock:
+        if _engine is None:
+            start = time.perf_counter()
+            engine = _build_engine(BACKEND)
+            _stats["engine_seconds"] = time.perf_counter() - start
+            _engine = engine
+    return _engine
+
+
+def warm_up():
+    """
+    Load the model and run one dummy forward pass so the first real request
+    does not pay for graph tracing. Safe to call on every rerun.
+    """
+    if _stats["warmed_up"]:
+        return
+    engine = get_engine()
+    with _lock:
+        if _stats["warmed_up"]:
+            return
+        start = time.perf_counter()
+        engine.warm_up()
+        _stats["warmup_seconds"] = time.perf_counter() - start
+        _stats["warmed_up"] = True
+
+
+def warm_up_in_background():
+    """
+    Start ``warm_up`` on a daemon thread and return at once, so the caller
+    (the first Streamlit render) does not wait for TensorFlow to import.
+    Requests that arrive earlier block on the registry lock until the model
+    is ready. Only the first call starts a thread.
+
+    Returns:
+        - threading.Thread: The warm-up thread.
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="model-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def model_stats():
+    """
+    Return load time and memory figures for the shared model.
+
+    Returns:
+        - dict: Copy of the registry statistics, including ``rss_delta_bytes``
+          (memory added by unpickling the model).
+    """
+    stats = dict(_stats)
+    before, after = stats["rss_before_bytes"], stats["rss_after_bytes"]
+    stats["rss_delta_bytes"] = after - before if before is not None and after is not None else None
+    stats["rss_bytes"] = _current_rss_bytes()
+    return stats
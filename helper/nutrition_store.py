@@ -0,0 +1,281 @@
+"""
+Local nutrition store, so the request path never waits on fatsecret.co.id.
+
+Rows live in a small SQLite file filled offline by the sync job, which reuses
+``scrape_nutrition_data``. The whole table is kept in a dict, so lookups are
+plain dictionary reads. Foods missing from the store fall back to
+``fruits_nutrition_db``. Entries older than ``NUTRITION_MAX_AGE`` seconds are
+served as-is and refreshed in a background thread.
+
+Usage:
+    python -m helper.nutrition_store sync
+    python -m helper.nutrition_store sync Apel Kiwi --db data/nutrition.sqlite
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .metrics import timed
+from .scrap import scrape_nutrition_data
+
+NUTRITION_DB_PATH = os.environ.get("NUTRITION_DB_PATH", "data/nutrition.sqlite")
+NUTRITION_MAX_AGE = float(os.environ.get("NUTRITION_MAX_AGE", str(7 * 24 * 3600)))
+NUTRITION_BACKGROUND_REFRESH = os.environ.get("NUTRITION_BACKGROUND_REFRESH", "1") == "1"
+# Minimum seconds between background refresh attempts for the same food
+NUTRITION_RETRY_AFTER = 300.0
+
+# Database nutrisi buah per 100 gram untuk rekomendasi
+fruits_nutrition_db = {
+    'Apel': {'kalori': 52, 'lemak': 0.2, 'karbohidrat': 14, 'protein': 0.3, 'serat': 2.4},
+    'Pisang': {'kalori': 89, 'lemak': 0.3, 'karbohidrat': 23, 'protein': 1.1, 'serat': 2.6},
+    'Alpukat': {'kalori': 160, 'lemak': 15, 'karbohidrat': 9, 'protein': 2, 'serat': 7},
+    'Ceri': {'kalori': 63, 'lemak': 0.2, 'karbohidrat': 16, 'protein': 1.1, 'serat': 2.1},
+    'Kiwi': {'kalori': 61, 'lemak': 0.5, 'karbohidrat': 15, 'protein': 1.1, 'serat': 3},
+    'Mangga': {'kalori': 60, 'lemak': 0.4, 'karbohidrat': 15, 'protein': 0.8, 'serat': 1.6},
+    'Jeruk': {'kalori': 47, 'lemak': 0.1, 'karbohidrat': 12, 'protein': 0.9, 'serat': 2.4},
+    'Nanas': {'kalori': 50, 'lemak': 0.1, 'karbohidrat': 13, 'protein': 0.5, 'serat': 1.4},
+    'Stroberi': {'kalori': 32, 'lemak': 0.3, 'karbohidrat': 8, 'protein': 0.7, 'serat': 2},
+    'Semangka': {'kalori': 30, 'lemak': 0.2, 'karbohidrat': 8, 'protein': 0.6, 'serat': 0.4}
+}
+
+
+def fallback_nutrition(food_name):
+    """
+    Format a ``fruits_nutrition_db`` entry like ``scrape_nutrition_data`` does.
+
+    Returns:
+        - tuple: (nutrition dict, volume) or ({}, 0) for unknown foods.
+    """
+    entry = fruits_nutrition_db.get(food_name)
+    if entry is None:
+        return {}, 0
+    return {
+        "Kalori": f"{entry['kalori']} kcal",
+        "Lemak": f"{entry['lemak']} g",
+        "Karbohidrat": f"{entry['karbohidrat']} g",
+        "Protein": f"{entry['protein']} g",
+    }, "100 gram"
+
+
+class NutritionStore:
+    """
+    SQLite-backed nutrition table with an in-memory copy for reads.
+
+    Parameters:
+        - path (str): SQLite file; created on first write.
+        - max_age (float): Seconds after which an entry is considered stale.
+        - fetch (callable): ``fetch(food_name) -> (nutrition, volume)`` used to refresh.
+        - background_refresh (bool): Refresh stale or missing entries on read.
+    """
+
+    def __init__(self, path=NUTRITION_DB_PATH, max_age=NUTRITION_MAX_AGE,
+                 fetch=scrape_nutrition_data, background_refresh=NUTRITION_BACKGROUND_REFRESH):
+        self.path = path
+        self.max_age = max_age
+        self.fetch = fetch
+        self.background_refresh = background_refresh
+        self._entries = {}
+        self._refreshing = set()
+        self._last_attempt = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._db = None
+        if os.path.exists(path):
+            self._load()
+
+    def _connect(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS nutrition "
+                "(food TEXT PRIMARY KEY, data TEXT, volume TEXT, fetched_at REAL)"
+            )
+        return self._db
+
+    def _load(self):
+        rows = self._connect().execute("SELECT food, data, volume, fetched_at FROM nutrition").fetchall()
+        self._entries = {
+            food: (json.loads(data), volume, fetched_at) for food, data, volume, fetched_at in rows
+        }
+
+    def get(self, food_name):
+        """
+        Return ``(nutrition, volume)`` for a food, falling back to
+        ``fruits_nutrition_db`` when the store has no entry.
+        """
+        entry = self._entries.get(food_name)
+        if entry is None or time.time() - entry[2] > self.max_age:
+            if self.background_refresh:
+                self.refresh_in_background([food_name])
+            if entry is None:
+                return fallback_nutrition(food_name)
+        return dict(entry[0]), entry[1]
+
+    def is_stale(self, food_name):
+        entry = self._entries.get(food_name)
+        return entry is None or time.time() - entry[2] > self.max_age
+
+    def stale_foods(self, foods=None):
+        """
+        Return the foods (by default every stored one) that need refreshing.
+        """
+        foods = self._entries.keys() if foods is None else foods
+        return [food for food in foods if self.is_stale(food)]
+
+    def update(self, food_name, nutrition, volume, fetched_at=None):
+        """
+        Write one entry to SQLite and the in-memory copy.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        volume = str(volume) if volume else None
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO nutrition (food, data, volume, fetched_at) VALUES (?, ?, ?, ?)",
+                    (food_name, json.dumps(nutrition), volume, fetched_at),
+                )
+            # Replace the dict instead of mutating it so readers never need the lock
+            entries = dict(self._entries)
+            entries[food_name] = (dict(nutrition), volume, fetched_at)
+            self._entries = entries
+        for listener in self._listeners:
+            try:
+                listener(food_name, dict(nutrition), volume)
+            except Exception as e:
+                print(f"Error notifying nutrition listener for {food_name}: {e}")
+
+    def add_listener(self, callback, replay=False):
+        """
+        Call ``callback(food_name, nutrition, volume)`` after every update.
+
+        With ``replay``, ``callback`` is first called for every entry already
+        stored. This happens under the update lock, so no entry written in
+        between is missed.
+        """
+        with self._lock:
+            if replay:
+                for food_name, (nutrition, volume, _) in self._entries.items():
+                    callback(food_name, dict(nutrition), volume)
+            self._listeners.append(callback)
+
+    def refresh(self, food_name):
+        """
+        Fetch one food and store it. Empty results are not stored, so the
+        previous entry or the fallback stays in use.
+
+        Returns:
+            - bool: Whether the entry was updated.
+        """
+        nutrition, volume = self.fetch(food_name)
+        if not nutrition:
+            return False
+        self.update(food_name, nutrition, volume)
+        return True
+
+    def refresh_in_background(self, foods):
+        """
+        Refresh ``foods`` in a daemon thread, skipping those already in flight
+        or attempted within the last ``NUTRITION_RETRY_AFTER`` seconds.
+        """
+        now = time.time()
+        with self._lock:
+            foods = [
+                food for food in foods
+                if food not in self._refreshing
+                and now - self._last_attempt.get(food, 0.0) >= NUTRITION_RETRY_AFTER
+            ]
+            self._refreshing.update(foods)
+            self._last_attempt.update((food, now) for food in foods)
+        if not foods:
+            return None
+
+        def worker():
+            for food in foods:
+                try:
+                    self.refresh(food)
+                except Exception as e:
+                    print(f"Error refreshing nutrition for {food}: {e}")
+                finally:
+                    with self._lock:
+                        self._refreshing.discard(food)
+
+        thread = threading.Thread(target=worker, name="nutrition-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_nutrition_store():
+    """
+    Return the process-wide NutritionStore.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = NutritionStore()
+    return _store
+
+
+@timed("nutrition_lookup")
+def get_nutrition(food_name):
+    """
+    Return ``(nutrition, volume)`` for a food from the shared store.
+    """
+    return get_nutrition_store().get(food_name)
+
+
+def sync(foods, path=NUTRITION_DB_PATH, delay=1.0):
+    """
+    Scrape every food into the store at ``path``.
+
+    Returns:
+        - list: Foods that could not be fetched.
+    """
+    store = NutritionStore(path, background_refresh=False)
+    failed = []
+    for i, food in enumerate(foods):
+        if i and delay:
+            time.sleep(delay)
+        try:
+            ok = store.refresh(food)
+        except Exception as e:
+            print(f"Error scraping {food}: {e}")
+            ok = False
+        print(f"{food}: {'ok' if ok else 'failed'}")
+        if not ok:
+            failed.append(food)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="Scrape foods into the local store")
+    sync_parser.add_argument("foods", nargs="*", help="Food names (default: every fruit in fruits_nutrition_db)")
+    sync_parser.add_argument("--db", default=NUTRITION_DB_PATH)
+    sync_parser.add_argument("--stale-only", action="store_true", help="Only refresh stale or missing entries")
+    sync_parser.add_argument("--delay", type=float, default=1.0, help="Seconds between requests")
+    args = parser.parse_args(argv)
+
+    foods = args.foods or list(fruits_nutrition_db)
+    if args.stale_only:
+        foods = NutritionStore(args.db, background_refresh=False).stale_foods(foods)
+    failed = sync(foods, args.db, args.delay)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Data-driven fruit combination optimizer over the nutrition matrix.
+
+``fruits_nutrition_db`` becomes an (n_foods, n_nutrients) NumPy matrix. A
+combination of k foods is scored on its mean nutrients per 100 g (the same
+averaging as ``total_cal`` in the recommendation tables):
+
+    score = sum(weight[j] * mean[j]) - calorie_weight * |mean_kalori - calorie_target|
+
+``top_combinations`` returns the N best combinations by branch-and-bound.
+Foods are ordered by their weighted-nutrient contribution, so the best
+possible completion of a partial combination is read off prefix sums. The
+calorie penalty is bounded by the smallest and largest calories still
+available. Whole subtrees whose bound cannot beat the current N-th best are
+skipped. The last food of every combination is scored for all candidates at
+once with vectorized operations. ``brute_force_top`` scores every
+combination and is kept as a reference for small catalogues.
+
+Usage:
+    from helper.optimizer import recommend
+    recommend('lose_weight', detected_fruit='Apel', k=3, top_n=5)
+"""
+
+import heapq
+import itertools
+from typing import NamedTuple
+
+import numpy as np
+
+from .nutrition_store import fruits_nutrition_db
+
+NUTRIENTS = ('kalori', 'lemak', 'karbohidrat', 'protein', 'serat')
+# Slack for floating-point error so a bound equal to a real score never prunes it
+BOUND_EPSILON = 1e-9
+
+
+class Objective(NamedTuple):
+    """
+    Parameters:
+        - calorie_target (float): Desired mean kcal per 100 g.
+        - calorie_weight (float): Penalty per kcal away from the target.
+        - weights (dict): Reward per unit of each nutrient's mean, e.g.
+          ``{'serat': 5.0}``; negative values penalise a nutrient.
+    """
+    calorie_target: float
+    calorie_weight: float = 1.0
+    weights: dict = {}
+
+
+GOAL_OBJECTIVES = {
+    'lose_weight': Objective(calorie_target=40, calorie_weight=1.0, weights={'serat': 6.0, 'protein': 2.0}),
+    'gain_weight': Objective(calorie_target=120, calorie_weight=0.5, weights={'protein': 8.0, 'lemak': 1.0, 'serat': 1.0}),
+}
+
+
+def nutrient_matrix(nutrition=None, nutrients=NUTRIENTS):
+    """
+    Return ``(names, matrix)`` where ``matrix[i, j]`` is nutrient ``j`` of
+    food ``names[i]``; missing values are 0.
+    """
+    nutrition = fruits_nutrition_db if nutrition is None else nutrition
+    names = list(nutrition)
+    matrix = np.array(
+        [[float(nutrition[name].get(nutrient, 0.0)) for nutrient in nutrients] for name in names],
+        dtype=np.float64,
+    ).reshape(len(names), len(nutrients))
+    return names, matrix
+
+
+def _objective_vectors(objective, nutrients):
+    weights = np.array([objective.weights.get(nutrient, 0.0) for nutrient in nutrients], dtype=np.float64)
+    return weights, nutrients.index('kalori')
+
+
+def score_sums(sums, k, objective, nutrients=NUTRIENTS):
+    """
+    Score combinations from their nutrient sums, shape (..., n_nutrients).
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+    weights, kalori = _objective_vectors(objective, nutrients)
+    means = sums / k
+    return means @ weights - objective.calorie_weight * np.abs(means[..., kalori] - objective.calorie_target)
+
+
+def _result(names, matrix, indices, score, nutrients):
+    means = matrix[list(indices)].mean(axis=0)
+    return {
+        'fruits': tuple(names[i] for i in indices),
+        'score': float(score),
+        'total_cal': int(means[nutrients.index('kalori')]),
+        'mean': {nutrient: round(float(value), 3) for nutrient, value in zip(nutrients, means)},
+    }
+
+
+def _resolve_must_include(names, must_include):
+    if must_include is None:
+        return []
+    if isinstance(must_include, str):
+        must_include = [must_include]
+    index = {name: i for i, name in enumerate(names)}
+    missing = [name for name in must_include if name not in index]
+    if missing:
+        raise ValueError(f"Unknown foods: {', '.join(missing)}")
+    return sorted({index[name] for name in must_include})
+
+
+def brute_force_top(k, objective, top_n=3, must_include=None, nutrition=None, nutrients=NUTRIENTS):
+    """
+    Score every k-food combination at once. Memory grows with C(n, k), so
+    this is only meant for small catalogues and for checking
+    ``top_combinations``.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+    names, matrix = nutrient_matrix(nutrition, nutrients)
+    forced = _resolve_must_include(names, must_include)
+    free = [i for i in range(len(names)) if i not in forced]
+    remaining = k - len(forced)
+    if remaining < 0 or len(free) < remaining or top_n < 1:
+        return []
+    if remaining == 0:
+        base = matrix[forced].sum(axis=0)
+        return [_result(names, matrix, tuple(forced), score_sums(base, k, objective, nutrients), nutrients)]
+
+    picks = np.array(list(itertools.combinations(free, remaining)), dtype=np.intp)
+    picks = picks.reshape(-1, remaining)
+    sums = matrix[picks].sum(axis=1) + matrix[forced].sum(axis=0)
+    scores = score_sums(sums, k, objective, nutrients)
+
+    order = np.argsort(-scores, kind='stable')[:top_n]
+    return [_result(names, matrix, tuple(sorted(forced + picks[i].tolist())), scores[i], nutrients) for i in order]
+
+
+def top_combinations(k, objective, top_n=3, must_include=None, nutrition=None, nutrients=NUTRIENTS,
+                     stats=None):
+    """
+    Return the ``top_n`` best k-food combinations under ``objective``.
+
+    Parameters:
+        - k (int): Foods per combination.
+        - objective (Objective): Scoring weights and calorie target.
+        - must_include (str or list): Foods every combination must contain,
+          e.g. the detected fruit.
+        - stats (dict): If given, filled with ``nodes`` visited, ``pruned``
+          subtrees and ``scored`` combinations.
+
+    Returns:
+        - list: Dicts with ``fruits``, ``score``, ``total_cal`` and ``mean``
+          nutrients, best first.
+
+    Raises:
+        - ValueError: ``k`` is below 1 or ``must_include`` names an unknown food.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+    names, matrix = nutrient_matrix(nutrition, nutrients)
+    forced = _resolve_must_include(names, must_include)
+    free = np.array([i for i in range(len(names)) if i not in forced], dtype=np.intp)
+    remaining = k - len(forced)
+    counters = {'nodes': 0, 'pruned': 0, 'scored': 0}
+    if stats is not None:
+        stats.update(counters)
+    if remaining < 0 or len(free) < remaining or top_n < 1:
+        return []
+
+    weights, kalori = _objective_vectors(objective, nutrients)
+    base = matrix[forced].sum(axis=0)
+    if remaining == 0:
+        return [_result(names, matrix, tuple(forced), score_sums(base, k, objective, nutrients), nutrients)]
+
+    # Order candidates by their weighted-nutrient contribution, best first, so
+    # the best completion from position i takes the next r foods
+    linear = matrix[free] @ weights / k
+    order = np.argsort(-linear, kind='stable')
+    free, linear = free[order], linear[order]
+    candidates = matrix[free]
+    calories = candidates[:, kalori]
+    n = len(free)
+    target_total = objective.calorie_target * k
+
+    linear_prefix = np.concatenate(([0.0], np.cumsum(linear)))
+    # fewest[i, r] / most[i, r]: smallest / largest kcal sum of r foods from position i on
+    fewest = np.full((n + 1, remaining + 1), np.inf)
+    most = np.full((n + 1, remaining + 1), -np.inf)
+    fewest[:, 0] = most[:, 0] = 0.0
+    for i in range(n):
+        tail = np.sort(calories[i:])
+        r = min(remaining, len(tail))
+        fewest[i, 1:r + 1] = np.cumsum(tail[:r])
+        most[i, 1:r + 1] = np.cumsum(tail[::-1][:r])
+
+    heap = []
+
+    def threshold():
+        return heap[0][0] if len(heap) == top_n else -np.inf
+
+    def push(score, picked):
+        item = (score, tuple(-index for index in picked))
+        if len(heap) < top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def bounds(start, r, sums):
+        # Optimistic: best weighted nutrients, then minus the smallest
+        # calorie penalty reachable with r more foods from position start on
+        best_linear = sums @ weights / k + linear_prefix[start + r] - linear_prefix[start]
+        low, high = sums[kalori] + fewest[start, r], sums[kalori] + most[start, r]
+        gap = max(low - target_total, target_total - high, 0.0)
+        return best_linear, best_linear - objective.calorie_weight * gap / k
+
+    def search(start, r, sums, picked):
+        counters['nodes'] += 1
+        if r == 1:
+            # Score every possible last food in one vectorized step
+            scores = score_sums(sums + candidates[start:], k, objective, nutrients)
+            counters['scored'] += len(scores)
+            limit = threshold()
+            for offset in np.flatnonzero(scores > limit):
+                push(float(scores[offset]), picked + [start + offset])
+            return
+        for i in range(start, n - r + 1):
+            best_linear, best = bounds(i, r, sums)
+            if best_linear + BOUND_EPSILON <= threshold():
+                # Later positions only have smaller linear terms: stop here
+                counters['pruned'] += n - r + 1 - i
+                break
+            if best + BOUND_EPSILON <= threshold():
+                # Later positions may still get closer to the calorie target
+                counters['pruned'] += 1
+                continue
+            search(i + 1, r - 1, sums + candidates[i], picked + [i])
+
+    search(0, remaining, base, [])
+    if stats is not None:
+        stats.update(counters)
+
+    results = []
+    for score, negated in sorted(heap, reverse=True):
+        indices = tuple(sorted(forced + [int(free[-position]) for position in negated]))
+        results.append(_result(names, matrix, indices, score, nutrients))
+    return results
+
+
+def recommend(goal, detected_fruit=None, k=3, top_n=3, nutrition=None):
+    """
+    Best combinations for a goal in ``GOAL_OBJECTIVES``, containing the
+    detected fruit when it is a known food.
+    """
+    if goal not in GOAL_OBJECTIVES:
+        raise ValueError(f"Unknown goal: {goal}")
+    nutrition = fruits_nutrition_db if nutrition is None else nutrition
+    must_include = detected_fruit if detected_fruit in nutrition else None
+    return top_combinations(k, GOAL_OBJECTIVES[goal], top_n, must_include, nutrition)
@@ -0,0 +1,263 @@
+"""
+Parser backends for fatsecret food pages.
+
+Every backend runs the same selectors and returns the same ``FoodPage``:
+
+- ``selectolax``: lexbor C parser (modest on old selectolax releases), fastest
+  when installed
+- ``lxml``: libxml2 with precompiled XPath equivalents of the selectors
+- ``html.parser``: BeautifulSoup with precompiled soupsieve selectors,
+  always available
+
+``selectolax`` and ``lxml`` are optional (see requirements-dev.txt);
+``html.parser`` needs only beautifulsoup4 and soupsieve from requirements.txt.
+``HTML_PARSER`` picks a backend (``auto`` by default, which takes the
+fastest one installed).
+"""
+
+import os
+import re
+from typing import NamedTuple, Union
+from urllib.parse import urlparse
+
+HTML_PARSER = os.environ.get("HTML_PARSER", "auto")
+
+NUMBER_RE = re.compile(r'\d+[.,]?\d*')
+
+# Label mapping berdasarkan prefix
+NUTRIENT_LABELS = {
+    "Kal": "Kalori",
+    "Lemak": "Lemak",
+    "Karb": "Karbohidrat",
+    "Prot": "Protein"
+}
+
+# Common portion types to look for
+PORTION_LABELS = frozenset([
+    "100 gram",
+    "1 mangkok",
+    "1 porsi",
+    "1 tusuk",
+    "1 gelas",
+    "1 buah",
+    "1 potong",
+    "1 piring"
+])
+
+NUTRIENT_TABLE = "table.generic.spaced"
+GENERIC_TABLE = "table.generic"
+SELECTED_ROW = "tr.selected"
+LINK = "a[href]"
+
+
+class FoodPage(NamedTuple):
+    """
+    Everything the scrapers need from one fatsecret food page.
+    """
+    nutrition: dict
+    default_volume: Union[str, int]
+    portion_links: dict
+
+
+def _build_page(nutrient_cells, default_volume, links):
+    """
+    Turn the raw texts every backend extracts into a FoodPage.
+
+    Parameters:
+        - nutrient_cells (iterable): Stripped text of each nutrient table cell.
+        - default_volume (str): Text of the selected volume cell, or None.
+        - links (iterable): (text, href) of every link in the generic tables.
+    """
+    nutrition = {}
+    for text in nutrient_cells:
+        for prefix, label in NUTRIENT_LABELS.items():
+            if text.startswith(prefix):
+                match = NUMBER_RE.search(text)
+                if match:
+                    value = match.group().replace(",", ".")
+                    nutrition[label] = value + " g" if label != "Kalori" else value + " kcal"
+                break
+
+    portion_links = {}
+    for text, href in links:
+        if text in PORTION_LABELS and text not in portion_links:
+            portion_links[text] = f"?{urlparse(href).query}"
+
+    return FoodPage(nutrition, default_volume if default_volume is not None else 0, portion_links)
+
+
+def _selectolax_parser():
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        # Old selectolax releases only ship the modest backend
+        from selectolax.parser import HTMLParser
+        return HTMLParser
+
+
+def _parse_selectolax(html):
+    tree = _selectolax_parser()(html)
+    text = lambda node: node.text(deep=True, separator="", strip=True)
+
+    table = tree.css_first(NUTRIENT_TABLE)
+    cells = [text(td) for td in table.css("td")] if table is not None else []
+
+    tables = tree.css(GENERIC_TABLE)
+    default_volume = None
+    if tables:
+        row = tables[0].css_first(SELECTED_ROW)
+        col = row.css_first("td") if row is not None else None
+        if col is not None:
+            default_volume = text(col)
+
+    links = [(text(a), a.attributes.get("href") or "") for t in tables for a in t.css(LINK)]
+    return _build_page(cells, default_volume, links)
+
+
+_lxml_xpaths = None
+
+
+def _class_xpath(tag, *classes):
+    tests = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes
+    )
+    return f".//{tag}[{tests}]"
+
+
+def _parse_lxml(html):
+    global _lxml_xpaths
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    if _lxml_xpaths is None:
+        _lxml_xpaths = {
+            "nutrient_table": etree.XPath(_class_xpath("table", "generic", "spaced")),
+            "generic_table": etree.XPath(_class_xpath("table", "generic")),
+            "selected_row": etree.XPath(_class_xpath("tr", "selected")),
+            "td": etree.XPath(".//td"),
+            "link": etree.XPath(".//a[@href]"),
+        }
+    xp = _lxml_xpaths
+    # libxml2 guesses latin-1 for bytes without a meta charset; decode as
+    # UTF-8 first like the other backends
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    try:
+        root = lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        # Empty document
+        return _build_page([], None, [])
+    text = lambda node: "".join(part.strip() for part in node.itertext())
+
+    nutrient_tables = xp["nutrient_table"](root)
+    cells = [text(td) for td in xp["td"](nutrient_tables[0])] if nutrient_tables else []
+
+    tables = xp["generic_table"](root)
+    default_volume = None
+    if tables:
+        rows = xp["selected_row"](tables[0])
+        cols = xp["td"](rows[0]) if rows else []
+        if cols:
+            default_volume = text(cols[0])
+
+    links = [(text(a), a.get("href")) for t in tables for a in xp["link"](t)]
+    return _build_page(cells, default_volume, links)
+
+
+_soupsieve_selectors = None
+
+
+def _parse_html_parser(html):
+    global _soupsieve_selectors
+    import soupsieve
+    from bs4 import BeautifulSoup
+
+    if _soupsieve_selectors is None:
+        _soupsieve_selectors = {
+            name: soupsieve.compile(selector)
+            for name, selector in (("nutrient_table", NUTRIENT_TABLE), ("generic_table", GENERIC_TABLE),
+                                   ("selected_row", SELECTED_ROW), ("td", "td"), ("link", LINK))
+        }
+    sel = _soupsieve_selectors
+    soup = BeautifulSoup(html, "html.parser")
+    text = lambda node: node.get_text(strip=True)
+
+    table = sel["nutrient_table"].select_one(soup)
+    cells = [text(td) for td in sel["td"].select(table)] if table is not None else []
+
+    tables = sel["generic_table"].select(soup)
+    default_volume = None
+    if tables:
+        row = sel["selected_row"].select_one(tables[0])
+        col = sel["td"].select_one(row) if row is not None else None
+        if col is not None:
+            default_volume = text(col)
+
+    links = [(text(a), a["href"]) for t in tables for a in sel["link"].select(t)]
+    return _build_page(cells, default_volume, links)
+
+
+BACKENDS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "html.parser": _parse_html_parser,
+}
+
+# Imported for each backend by available_backends(). A module can be found
+# and still fail to import (selectolax.parser raises on selectolax >= 1.0)
+_BACKEND_IMPORTS = {
+    "selectolax": _selectolax_parser,
+    "lxml": lambda: __import__("lxml.html"),
+    "html.parser": lambda: (__import__("bs4"), __import__("soupsieve")),
+}
+
+
+def available_backends():
+    """
+    Return the backends that import, fastest first.
+    """
+    available = []
+    for name, load in _BACKEND_IMPORTS.items():
+        try:
+            load()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+_resolved = {}
+
+
+def resolve_backend(backend=None):
+    """
+    Return the backend name to use: ``backend``, else ``HTML_PARSER``.
+    ``auto`` means the fastest installed backend, and a backend that is not
+    installed falls back to ``html.parser``.
+    """
+    backend = backend or HTML_PARSER
+    if backend not in _resolved:
+        if backend != "auto" and backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {backend}")
+        available = available_backends()
+        if backend == "auto":
+            _resolved[backend] = available[0] if available else "html.parser"
+        else:
+            _resolved[backend] = backend if backend in available else "html.parser"
+    return _resolved[backend]
+
+
+def parse_food_page(html, backend=None):
+    """
+    Extract the nutrient table, the default volume and the portion links
+    from a food page with a single parse.
+
+    Parameters:
+        - html (bytes or str): Page source.
+        - backend (str): "selectolax", "lxml", "html.parser" or "auto".
+
+    Returns:
+        - FoodPage
+    """
+    return BACKENDS[resolve_backend(backend)](html)
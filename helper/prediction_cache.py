@@ -0,0 +1,165 @@
+"""
+Content-addressed cache of predictions, keyed by a hash of the raw image bytes.
+
+Re-uploading the same photo returns the stored ``(fruit_name, confidence)``
+without decoding or running the model. The cache has a bounded in-memory LRU
+tier and an optional SQLite tier (``PREDICTION_CACHE_PATH``) that survives
+restarts. Both tiers are tied to the model checksum and are emptied when it
+changes.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .model_registry import model_checksum
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_PATH = os.environ.get("PREDICTION_CACHE_PATH") or None
+
+
+def image_key(image_bytes):
+    """
+    Return a 128-bit BLAKE2b hex digest of the encoded image.
+    """
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """
+    Two-tier LRU cache of ``(fruit_name, confidence)`` results.
+
+    Parameters:
+        - max_entries (int): Size of the in-memory tier.
+        - disk_path (str): SQLite file for the persistent tier, or None.
+        - checksum (str): Model checksum the stored predictions belong to.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, disk_path=None, checksum=None):
+        self.max_entries = max_entries
+        self.checksum = checksum
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, fruit TEXT, confidence REAL)"
+            )
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'model_checksum'").fetchone()
+            if row is None or row[0] != checksum:
+                self._reset_disk()
+
+    def _reset_disk(self):
+        with self._db:
+            self._db.execute("DELETE FROM predictions")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('model_checksum', ?)",
+                (self.checksum,),
+            )
+
+    def get(self, key):
+        """
+        Return the cached prediction for ``key``, or None.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT fruit, confidence FROM predictions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row
+
+            self.misses += 1
+            return None
+
+    def put(self, key, prediction):
+        """
+        Store ``(fruit_name, confidence)`` in both tiers.
+        """
+        prediction = (prediction[0], float(prediction[1]))
+        with self._lock:
+            self._remember(key, prediction)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO predictions (key, fruit, confidence) VALUES (?, ?, ?)",
+                        (key,) + prediction,
+                    )
+
+    def _remember(self, key, prediction):
+        self._memory[key] = prediction
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(self, image_bytes, compute):
+        """
+        Return the cached prediction for ``image_bytes`` or call ``compute()``
+        and store its result. Exceptions from ``compute`` are not cached.
+        """
+        key = image_key(image_bytes)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        prediction = compute()
+        self.put(key, prediction)
+        return prediction
+
+    def invalidate(self, checksum=None):
+        """
+        Drop every cached prediction, e.g. after the model file changed.
+        """
+        with self._lock:
+            self._memory.clear()
+            if checksum is not None:
+                self.checksum = checksum
+            if self._db is not None:
+                self._reset_disk()
+
+    def stats(self):
+        """
+        Return hit/miss counters and tier sizes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "checksum": self.checksum,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """
+    Return the process-wide PredictionCache for the active model.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache(disk_path=PREDICTION_CACHE_PATH, checksum=model_checksum())
+    return _cache
@@ -0,0 +1,154 @@
+"""
+Multiprocess decode/preprocess stage with shared-memory batch buffers.
+
+PIL decoding and resizing hold the GIL for much of their work, so threads do
+not scale across cores. ``SharedBatchPool`` runs ``preprocess_into`` in worker
+processes that write straight into float32 batch buffers in
+``multiprocessing.shared_memory``. The parent passes only image bytes or
+file paths in and receives the batch as a NumPy view of the same memory,
+without pickling or copying any arrays.
+
+Several buffers are rotated, so workers fill the next batch while the
+current one is being classified.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .functions import open_image_mmap, preprocess_into
+
+# Set in each worker by _init_worker
+_worker_views = None
+_worker_buffers = None
+_worker_target_size = None
+
+
+def _init_worker(names, shape, target_size):
+    global _worker_views, _worker_buffers, _worker_target_size
+    _worker_buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker_views = [np.ndarray(shape, dtype=np.float32, buffer=shm.buf) for shm in _worker_buffers]
+    _worker_target_size = target_size
+
+
+def _fill(slot, start, images):
+    """
+    Worker task: preprocess ``images`` into rows ``start``... of buffer ``slot``.
+
+    Returns:
+        - list: ``(row, error)`` for every image that failed.
+    """
+    failures = []
+    view = _worker_views[slot]
+    for offset, image in enumerate(images):
+        try:
+            if isinstance(image, str):
+                with open_image_mmap(image) as mapped:
+                    preprocess_into(mapped, view[start + offset], _worker_target_size)
+            else:
+                preprocess_into(image, view[start + offset], _worker_target_size)
+        except Exception as e:
+            failures.append((start + offset, str(e)))
+    return failures
+
+
+class SharedBatchPool:
+    """
+    Parameters:
+        - workers (int): Worker processes (default: number of CPUs).
+        - batch_size (int): Rows per shared buffer.
+        - slots (int): Buffers in rotation; at least 2 for overlap.
+        - target_size (tuple): (width, height) of the model input.
+    """
+
+    def __init__(self, workers=None, batch_size=32, slots=3, target_size=(224, 224)):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.shape = (batch_size, target_size[1], target_size[0], 3)
+        size = int(np.prod(self.shape)) * np.dtype(np.float32).itemsize
+        self._buffers = [shared_memory.SharedMemory(create=True, size=size) for _ in range(max(slots, 2))]
+        self._views = [np.ndarray(self.shape, dtype=np.float32, buffer=shm.buf) for shm in self._buffers]
+        # Spawned workers never inherit TensorFlow state from the parent
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=([shm.name for shm in self._buffers], self.shape, target_size),
+        )
+
+    def _submit(self, slot, images):
+        per_task = -(-len(images) // self.workers)
+        return [
+            self._executor.submit(_fill, slot, start, images[start:start + per_task])
+            for start in range(0, len(images), per_task)
+        ]
+
+    def _collect(self, slot, names, futures, failures):
+        failed_rows = {}
+        for future in futures:
+            failed_rows.update(future.result())
+
+        view = self._views[slot][:len(names)]
+        if failed_rows:
+            ok = [row for row in range(len(names)) if row not in failed_rows]
+            failures = failures + [(names[row], error) for row, error in sorted(failed_rows.items())]
+            names = [names[row] for row in ok]
+            # Compact the good rows to the front (rare, so the copy is fine)
+            view[:len(ok)] = view[ok]
+            view = view[:len(ok)]
+        return names, view, failures
+
+    def iter_batches(self, items):
+        """
+        Preprocess ``(name, image, error)`` items, where ``image`` is encoded
+        bytes or a file path, and yield ``(names, batch, failures)``.
+
+        ``batch`` is a view of a shared buffer that stays valid until the next
+        batch is requested. ``failures`` lists ``(name, error)`` pairs.
+        """
+        free = deque(range(len(self._buffers)))
+        in_flight = deque()
+
+        def chunks():
+            names, images, failures = [], [], []
+            for name, image, error in items:
+                if error is not None:
+                    failures.append((name, error))
+                    continue
+                names.append(name)
+                images.append(image)
+                if len(names) == self.batch_size:
+                    yield names, images, failures
+                    names, images, failures = [], [], []
+            if names or failures:
+                yield names, images, failures
+
+        for names, images, failures in chunks():
+            if not free:
+                slot, *pending = in_flight.popleft()
+                yield self._collect(slot, *pending)
+                free.append(slot)
+            slot = free.popleft()
+            in_flight.append((slot, names, self._submit(slot, images) if images else [], failures))
+
+        while in_flight:
+            slot, *pending = in_flight.popleft()
+            yield self._collect(slot, *pending)
+            free.append(slot)
+
+    def close(self):
+        self._executor.shutdown()
+        self._views = []
+        for shm in self._buffers:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,140 @@
+"""
+Build post-training quantized TFLite variants of model/model.pkl and report
+how they compare with the float32 Keras model.
+
+The labelled folder holds one sub-folder per fruit, named as in
+``fruits_list`` (case-insensitive), e.g. ``samples/Apel/*.jpg``.
+
+Usage:
+    python -m helper.quantize --images samples/ --report quantization_report.json
+    MODEL_VARIANT=int8 streamlit run app.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from .engine import KerasEngine, TFLiteEngine
+from .export import export_tflite
+from .functions import preprocess_image
+from .inference import fruits_list
+from .model_registry import MODEL_PATH, TFLITE_VARIANT_PATHS, get_model
+
+
+def quantize(model, variant, path):
+    """
+    Write a quantized TFLite file.
+
+    Parameters:
+        - variant (str): ``"int8"`` for dynamic-range int8 weights or
+          ``"fp16"`` for float16 weights.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant != "int8":
+        raise ValueError(f"Unknown quantization variant: {variant}")
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def load_labelled_images(root):
+    """
+    Load and preprocess every image under ``root/<fruit>/``.
+
+    Returns:
+        - tuple: (batch of shape (N, 224, 224, 3), list of label indices)
+    """
+    label_index = {name.lower(): i for i, name in enumerate(fruits_list)}
+    arrays, labels = [], []
+    for folder in sorted(os.listdir(root)):
+        if folder.lower() not in label_index:
+            continue
+        folder_path = os.path.join(root, folder)
+        for name in sorted(os.listdir(folder_path)):
+            # Sub-folders and unreadable or non-image files are skipped
+            try:
+                with open(os.path.join(folder_path, name), "rb") as f:
+                    arrays.append(preprocess_image(f.read()))
+            except Exception:
+                continue
+            labels.append(label_index[folder.lower()])
+    if not arrays:
+        raise ValueError(f"No labelled images found in {root}")
+    return np.concatenate(arrays, axis=0), labels
+
+
+def evaluate(engine, batch, labels, reference_top1=None):
+    """
+    Run ``engine`` one image at a time and collect accuracy and latency.
+    One untimed call comes first, so graph tracing or tensor allocation
+    does not land in the percentiles.
+    """
+    engine(batch[:1])
+    timings, predictions = [], []
+    for i in range(len(batch)):
+        start = time.perf_counter()
+        output = engine(batch[i:i + 1])
+        timings.append(time.perf_counter() - start)
+        predictions.append(int(np.argmax(output[0])))
+
+    timings.sort()
+    predictions = np.array(predictions)
+    result = {
+        "accuracy": float(np.mean(predictions == np.array(labels))),
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": timings[int(0.99 * (len(timings) - 1))] * 1000,
+    }
+    if reference_top1 is not None:
+        result["top1_agreement"] = float(np.mean(predictions == reference_top1))
+    return result, predictions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="Folder with one sub-folder of images per fruit")
+    parser.add_argument("--variants", nargs="+", choices=["fp16", "int8"], default=["fp16", "int8"])
+    parser.add_argument("--report", default="quantization_report.json")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    model = get_model()
+    batch, labels = load_labelled_images(args.images)
+
+    keras_result, reference_top1 = evaluate(KerasEngine(model), batch, labels)
+    keras_result.update(variant="keras-fp32", top1_agreement=1.0,
+                        size_bytes=os.path.getsize(MODEL_PATH))
+    rows = [keras_result]
+
+    paths = {"fp32": export_tflite(model, TFLITE_VARIANT_PATHS["fp32"])}
+    for variant in args.variants:
+        paths[variant] = quantize(model, variant, TFLITE_VARIANT_PATHS[variant])
+
+    for variant, path in paths.items():
+        engine = TFLiteEngine(path, num_threads=args.threads)
+        result, _ = evaluate(engine, batch, labels, reference_top1)
+        result.update(variant=f"tflite-{variant}", size_bytes=os.path.getsize(path))
+        rows.append(result)
+
+    with open(args.report, "w") as f:
+        json.dump({"images": len(labels), "results": rows}, f, indent=2)
+
+    print(f"{'variant':<14}{'size MB':>9}{'top-1 agr':>11}{'accuracy':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['variant']:<14}{row['size_bytes'] / 1e6:>9.2f}{row['top1_agreement']:>11.2%}"
+              f"{row['accuracy']:>10.2%}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+    print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Fruit combination recommendations for weight goals.
+
+Shared by the Streamlit UI and the HTTP service. Every goal x fruit result
+is built once from ``fruits_nutrition_db`` and frozen (read-only mappings
+and tuples), so a request is a single dict lookup. When the nutrition store
+saves a per-100 g entry for a fruit, only the combinations containing that
+fruit and that fruit's own notes are rebuilt. The engine works on its own
+copy of the nutrition table, seeded with the store's per-100 g entries.
+"""
+
+import re
+import threading
+from types import MappingProxyType
+
+from .nutrition_store import fruits_nutrition_db, get_nutrition_store
+
+GOALS = ('lose_weight', 'gain_weight')
+
+# Fruits at or below this many kcal/100g suit a diet, those above it weight gain
+CALORIE_THRESHOLD = 60
+
+GOAL_TEXT = {
+    'lose_weight': {
+        'title': '🍃 Rekomendasi untuk Menurunkan Berat Badan',
+        'description': 'Kombinasi buah rendah kalori dan tinggi serat untuk membantu diet',
+    },
+    'gain_weight': {
+        'title': '💪 Rekomendasi untuk Menambah Berat Badan',
+        'description': 'Kombinasi buah tinggi kalori dan nutrisi untuk menambah massa tubuh sehat',
+    },
+}
+
+COMBINATIONS = {
+    'lose_weight': (
+        {
+            'name': 'Kombinasi Ultra Low-Cal',
+            'fruits': ('Semangka', 'Stroberi', 'Jeruk'),
+            'benefits': 'Sangat rendah kalori (30-47 kal/100g), tinggi air, membantu hidrasi',
+        },
+        {
+            'name': 'Kombinasi Serat Tinggi',
+            'fruits': ('Apel', 'Kiwi', 'Stroberi'),
+            'benefits': 'Tinggi serat, memberikan rasa kenyang lebih lama',
+        },
+        {
+            'name': 'Kombinasi Vitamin C',
+            'fruits': ('Jeruk', 'Kiwi', 'Stroberi'),
+            'benefits': 'Kaya vitamin C, meningkatkan metabolisme, rendah kalori',
+        },
+    ),
+    'gain_weight': (
+        {
+            'name': 'Kombinasi High-Energy',
+            'fruits': ('Alpukat', 'Pisang', 'Mangga'),
+            'benefits': 'Tinggi kalori dan lemak sehat, karbohidrat kompleks',
+        },
+        {
+            'name': 'Kombinasi Protein & Kalori',
+            'fruits': ('Alpukat', 'Pisang', 'Ceri'),
+            'benefits': 'Kombinasi protein, lemak sehat, dan karbohidrat',
+        },
+        {
+            'name': 'Kombinasi Natural Sugar',
+            'fruits': ('Pisang', 'Mangga', 'Ceri'),
+            'benefits': 'Gula alami untuk energi cepat, mendukung penambahan berat badan',
+        },
+    ),
+}
+
+# Store keys and the per-100g keys they map to; fibre is not scraped
+STORE_NUTRIENTS = {'Kalori': 'kalori', 'Lemak': 'lemak', 'Karbohidrat': 'karbohidrat', 'Protein': 'protein'}
+NUMBER_RE = re.compile(r'[\d.,]+')
+
+
+def detected_fruit_note(fruit, goal, nutrition):
+    """
+    Return the note about how well the detected fruit fits ``goal``, or
+    None for fruits without nutrition data.
+    """
+    if fruit not in nutrition:
+        return None
+    kalori = nutrition[fruit]['kalori']
+    if goal == 'lose_weight' and kalori <= CALORIE_THRESHOLD:
+        return f"✅ {fruit} sangat cocok untuk diet Anda (hanya {kalori} kalori/100g)"
+    elif goal == 'gain_weight' and kalori >= CALORIE_THRESHOLD:
+        return f"✅ {fruit} bagus untuk menambah berat badan ({kalori} kalori/100g)"
+    elif goal == 'lose_weight' and kalori > CALORIE_THRESHOLD:
+        return f"⚠️ {fruit} cukup tinggi kalori ({kalori} kal/100g), konsumsi dalam porsi kecil"
+    else:
+        return f"ℹ️ {fruit} rendah kalori ({kalori} kal/100g), tambahkan buah tinggi kalori lainnya"
+
+
+def _freeze_combination(combination, nutrition):
+    fruits = combination['fruits']
+    return MappingProxyType({
+        **combination,
+        'total_cal': sum(nutrition[fruit]['kalori'] for fruit in fruits) // len(fruits),
+    })
+
+
+def _freeze_result(goal, combinations, note):
+    result = {**GOAL_TEXT[goal], 'combinations': combinations}
+    if note is not None:
+        result['detected_fruit_note'] = note
+    return MappingProxyType(result)
+
+
+def per_100g_from_store(nutrition, volume):
+    """
+    Convert a nutrition store entry to ``fruits_nutrition_db`` units, or
+    return None unless it is given per 100 gram.
+    """
+    if not volume or str(volume).replace(' ', '').lower() not in ('100gram', '100g'):
+        return None
+    values = {}
+    for label, key in STORE_NUTRIENTS.items():
+        match = NUMBER_RE.search(str(nutrition.get(label, '')))
+        if match:
+            number = float(match.group().replace(',', '.'))
+            values[key] = int(number) if number.is_integer() else number
+    return values or None
+
+
+class RecommendationEngine:
+    """
+    Precomputed, read-only recommendation tables.
+
+    Parameters:
+        - nutrition (dict): Per-100g nutrition by fruit. It is copied, and
+          ``update_fruit`` swaps in a new copy, so the caller's dict is never
+          changed; read the current values from ``self.nutrition``.
+    """
+
+    def __init__(self, nutrition=fruits_nutrition_db):
+        self.nutrition = dict(nutrition)
+        self._lock = threading.Lock()
+        self._combinations = {goal: self._build_combinations(goal) for goal in GOALS}
+        self._tables = {}
+        for goal in GOALS:
+            self._tables.update(self._build_goal(goal, self._combinations[goal]))
+
+    def _build_combinations(self, goal):
+        return tuple(_freeze_combination(combination, self.nutrition) for combination in COMBINATIONS[goal])
+
+    def _build_goal(self, goal, combinations, fruits=None):
+        fruits = self.nutrition if fruits is None else fruits
+        table = {(goal, fruit): _freeze_result(goal, combinations, detected_fruit_note(fruit, goal, self.nutrition))
+                 for fruit in fruits}
+        # Fruits the table does not know get the goal's combinations without a note
+        table[(goal, None)] = _freeze_result(goal, combinations, None)
+        return table
+
+    def get(self, detected_fruit, goal):
+        """
+        Return the frozen recommendations for ``detected_fruit`` and ``goal``.
+        """
+        result = self._tables.get((goal, detected_fruit))
+        if result is None:
+            result = self._tables.get((goal, None))
+        if result is None:
+            # Unknown goal: only the detected fruit note applies
+            note = detected_fruit_note(detected_fruit, goal, self.nutrition)
+            return MappingProxyType({} if note is None else {'detected_fruit_note': note})
+        return result
+
+    def update_fruit(self, fruit, values):
+        """
+        Merge new per-100g ``values`` for ``fruit`` and rebuild only what
+        depends on it: the goals whose combinations include the fruit, and
+        the fruit's own entries for the other goals.
+
+        Returns:
+            - list: Goals whose combinations were rebuilt.
+        """
+        with self._lock:
+            old = self.nutrition.get(fruit, {})
+            merged = {**old, **values}
+            if merged == old or 'kalori' not in merged:
+                return []
+            nutrition = dict(self.nutrition)
+            nutrition[fruit] = merged
+            self.nutrition = nutrition
+
+            tables = dict(self._tables)
+            rebuilt = []
+            for goal in GOALS:
+                if any(fruit in combination['fruits'] for combination in COMBINATIONS[goal]):
+                    self._combinations[goal] = self._build_combinations(goal)
+                    tables.update(self._build_goal(goal, self._combinations[goal]))
+                    rebuilt.append(goal)
+                else:
+                    tables.update(self._build_goal(goal, self._combinations[goal], [fruit]))
+            # Swap the whole table so lookups never see a half-built state
+            self._tables = tables
+            return rebuilt
+
+    def on_store_update(self, food_name, nutrition, volume):
+        """
+        NutritionStore listener: apply entries that are given per 100 gram.
+        """
+        values = per_100g_from_store(nutrition, volume)
+        if values is not None:
+            self.update_fruit(food_name, values)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_recommendation_engine():
+    """
+    Return the process-wide RecommendationEngine. On first use it is seeded
+    with the entries already in the shared nutrition store and subscribed
+    to later updates.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = RecommendationEngine()
+                get_nutrition_store().add_listener(engine.on_store_update, replay=True)
+                _engine = engine
+    return _engine
+
+
+def get_fruit_recommendations(detected_fruit, goal):
+    """
+    Generate fruit combination recommendations based on detected fruit and goal
+    goal: 'lose_weight' or 'gain_weight'
+
+    The result is read-only; use ``thaw`` for a JSON-serialisable copy.
+    """
+    return get_recommendation_engine().get(detected_fruit, goal)
+
+
+def thaw(value):
+    """
+    Return a plain dict/list copy of a frozen result.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
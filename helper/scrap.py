@@ -1,60 +1,81 @@
-import requests
-from bs4 import BeautifulSoup
-import re
+import asyncio
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import http_client
+from .cache import ttl_cache
+from .metrics import timed
+from .parsers import FoodPage, parse_food_page
+
+# Overridable so the scrapers can run against a local stub server
+FATSECRET_BASE_URL = os.environ.get("FATSECRET_BASE_URL", "https://www.fatsecret.co.id/kalori-gizi/umum/")
+
+# Scrape results are cached in-process: fresh for SCRAPE_CACHE_TTL seconds,
+# then served stale for up to SCRAPE_CACHE_STALE_TTL while being refreshed.
+# Failed lookups are remembered for SCRAPE_NEGATIVE_TTL seconds.
+SCRAPE_CACHE_TTL = float(os.environ.get("SCRAPE_CACHE_TTL", str(6 * 3600)))
+SCRAPE_CACHE_STALE_TTL = float(os.environ.get("SCRAPE_CACHE_STALE_TTL", str(7 * 24 * 3600)))
+SCRAPE_NEGATIVE_TTL = float(os.environ.get("SCRAPE_NEGATIVE_TTL", "60"))
+
+# Portion pages fetched at the same time by scrape_portion_nutrition
+PORTION_CONCURRENCY = int(os.environ.get("PORTION_CONCURRENCY", "4"))
+
+# Slugs on fatsecret that differ from the fruit name
+FOOD_SLUG_ALIASES = {
+    'ceri': 'ceri-manis',
+    'kiwi': 'buah-kiwi',
+}
+
+
+def food_slug(food_name):
+    """
+    Turn a food name into its fatsecret URL slug.
+    """
+    slug = food_name.replace(" ", "-").lower()
+    return FOOD_SLUG_ALIASES.get(slug, slug)
+
+
+@ttl_cache(ttl=SCRAPE_CACHE_TTL, stale_ttl=SCRAPE_CACHE_STALE_TTL, negative_ttl=SCRAPE_NEGATIVE_TTL,
+           is_negative=lambda page: not page.nutrition and not page.portion_links)
+def _fetch_page(slug, portion_url):
+    # Cached on (slug, portion_url) so "Apel" and "apel" share one entry
+    response = http_client.get(FATSECRET_BASE_URL + slug + (portion_url or ""))
+    # Retries end with the last response rather than an exception, so an
+    # error page must not be parsed (and negative-cached) as "no data"
+    response.raise_for_status()
+    return parse_food_page(response.content)
+
+
+def fetch_food_page(food_name, portion_url=None):
+    """
+    Download and parse one food page.
+
+    Parameters:
+        - food_name (str): Name of the food to search for
+        - portion_url (str): Optional portion query string from
+          ``scrape_portion_links``, e.g. "?portionid=...&portionamount=1.000"
+
+    Returns:
+        - FoodPage
+    """
+    return _fetch_page(food_slug(food_name), portion_url or None)
+
+
+fetch_food_page.cache = _fetch_page.cache
 
-from urllib.parse import urlparse
 
 # nutrisi
-def scrape_nutrition_data(food_name):
-    food_name = food_name.replace(" ", "-").lower()
-    if food_name == 'ceri':
-        food_name = 'ceri-manis'
-    
-    if food_name == 'kiwi':
-        food_name = 'buah-kiwi'
-    
-    url = "https://www.fatsecret.co.id/kalori-gizi/umum/" + food_name
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
+@timed("scrape_nutrition")
+def scrape_nutrition_data(food_name, portion_url=None):
+    """
+    Scrape the nutrition table of a food page.
 
-    table = soup.find("table", class_="generic spaced")
-    tabe_volume = soup.find("table", class_='generic')
-    
-    # Label mapping berdasarkan prefix
-    label_map = {
-        "Kal": "Kalori",
-        "Lemak": "Lemak",
-        "Karb": "Karbohidrat",
-        "Prot": "Protein"
-    }
-    
-    default_volume = 0
-    result = {}
-
-    if table:
-        rows = table.   find_all("tr")
-        for row in rows:
-            cols = row.find_all("td")
-            for col in cols:
-                text = col.get_text(strip=True)
-                for prefix, label in label_map.items():
-                    if text.startswith(prefix):
-                        match = re.search(r'\d+[.,]?\d*', text)
-                        if match:
-                            value = str(match.group().replace(",", "."))
-                            result[label] = value + " g" if label != "Kalori" else value + " kcal"
-                        break  
-
-    if tabe_volume:
-        rows = tabe_volume.find("tr", class_="selected")
-        
-        if rows:
-            cols = rows.find("td")
-            if cols:
-                text = cols.get_text(strip=True)
-                default_volume = text
-    
-    return result, default_volume
+    Returns:
+        - tuple: (nutrition dict, default volume text or 0)
+    """
+    page = fetch_food_page(food_name, portion_url)
+    return page.nutrition, page.default_volume
 
 # link porsi
 def scrape_portion_links(food_name):
@@ -69,66 +90,73 @@ def scrape_portion_links(food_name):
     """
     try:
         food_name = food_name.replace(" ", "-").lower()
-        
-        url = "https://www.fatsecret.co.id/kalori-gizi/umum/" + food_name
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        # Common portion types to look for
-        label_map = [
-            "100 gram",
-            "1 mangkok", 
-            "1 porsi",
-            "1 tusuk",
-            "1 gelas",
-            "1 buah",
-            "1 potong",
-            "1 piring"
-        ]
-
-        tables = soup.find_all("table", class_="generic")
-        portion_links_dict = {}
-
-        for table in tables:
-            links = table.find_all("a", href=True)
-            for link in links:
-                text = link.get_text(strip=True)
-                if text in label_map and text not in portion_links_dict:
-                    href = link["href"]
-                    parsed = urlparse(href)
-                    query = f"?{parsed.query}"
-                    portion_links_dict[text] = query
+        page = fetch_food_page(food_name)
 
         # Format the results for better structure
-        portion_links = [
+        return [
             {
                 "text": key, 
                 "url": value,
                 "description": f"Porsi {key} untuk {food_name.replace('-', ' ')}"
             } 
-            for key, value in portion_links_dict.items()
+            for key, value in page.portion_links.items()
         ]
-        
-        return portion_links
     except Exception as e:
         print(f"Error scraping portion links: {e}")
         return []
 
 # porsi nutrisi
-def scrape_portion_nutrition(food_name):
+async def scrape_portion_nutrition_async(food_name, max_concurrency=PORTION_CONCURRENCY):
+    """
+    Scrape the nutrition of every portion of a food concurrently.
+
+    Fetching and parsing run in worker threads, at most ``max_concurrency``
+    portion pages at a time, so the event loop is never blocked.
+
+    Returns:
+        - list: Nutrition dicts with extra "porsi" and "volume" keys, in
+          the order of ``scrape_portion_links``. Failed portions are skipped.
+    """
     food_name = food_name.replace(" ", "-").lower()
-    
-    portion_links = scrape_portion_links(food_name)
-    
-    portion_nutrition = []
-    for portion in portion_links:
-        portion_text = portion["text"]
-        portion_url = portion["url"]
-        nutrition_data, volume = scrape_nutrition_data(food_name, portion_url)
-        
+
+    portion_links = await asyncio.to_thread(scrape_portion_links, food_name)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def scrape_portion(portion):
+        async with semaphore:
+            nutrition_data, volume = await asyncio.to_thread(
+                scrape_nutrition_data, food_name, portion["url"]
+            )
+
         # Gabungkan data nutrisi dengan informasi porsi
-        nutrition_data["porsi"] = portion_text
+        nutrition_data["porsi"] = portion["text"]
         nutrition_data["volume"] = volume
-        portion_nutrition.append(nutrition_data)
-        
-    return portion_nutrition    
\ No newline at end of file
+        return nutrition_data
+
+    results = await asyncio.gather(
+        *(scrape_portion(portion) for portion in portion_links), return_exceptions=True
+    )
+
+    portion_nutrition = []
+    for portion, result in zip(portion_links, results):
+        if isinstance(result, Exception):
+            print(f"Error scraping portion {portion['text']}: {result}")
+            continue
+        portion_nutrition.append(result)
+    return portion_nutrition
+
+
+def scrape_portion_nutrition(food_name, max_concurrency=PORTION_CONCURRENCY):
+    """
+    Synchronous wrapper around ``scrape_portion_nutrition_async`` for
+    callers such as the Streamlit script.
+    """
+    coroutine = scrape_portion_nutrition_async(food_name, max_concurrency)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # Already inside an event loop: run ours in a separate thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -0,0 +1,50 @@
+import os
+import random
+
+import pytest
+
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "images")
+# Saved fatsecret pages, named after the URL slug
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "pages")
+
+
+def load_pages(directory=PAGES_DIR):
+    """
+    Return ``{file name: page bytes}`` for every .html file in ``directory``.
+    """
+    pages = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as f:
+                pages[name] = f.read()
+    return pages
+
+
+def make_catalogue(size, seed=0):
+    """
+    Build ``size`` foods with per-100g values in realistic fruit ranges.
+    """
+    rng = random.Random(seed)
+    return {
+        f"food-{i:04d}": {
+            'kalori': rng.randint(15, 180),
+            'lemak': round(rng.gammavariate(1.0, 0.8), 1),
+            'karbohidrat': round(rng.uniform(4, 30), 1),
+            'protein': round(rng.gammavariate(2.0, 0.5), 1),
+            'serat': round(rng.gammavariate(2.0, 1.2), 1),
+        }
+        for i in range(size)
+    }
+
+
+@pytest.fixture
+def sample_images():
+    """
+    ``{name: jpeg bytes}`` for the photos in tests/fixtures/images.
+    """
+    images = {}
+    for name in sorted(os.listdir(IMAGES_DIR)):
+        if name.endswith(".jpg"):
+            with open(os.path.join(IMAGES_DIR, name), "rb") as f:
+                images[name] = f.read()
+    return images
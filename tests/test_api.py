@@ -0,0 +1,89 @@
+"""
+HTTP error handling of the inference service. No model is needed: every
+request here fails before the forward pass.
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from starlette.testclient import TestClient
+
+import api
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from helper.prediction_cache import PredictionCache
+
+    # No model file here: keep the cache from hashing one
+    monkeypatch.setattr(api, "get_prediction_cache", PredictionCache)
+    # Not used as a context manager, so the lifespan does not load the model
+    return TestClient(api.app, raise_server_exceptions=False)
+
+
+def test_malformed_content_length_is_400(client):
+    response = client.post("/classify", content=b"x", headers={"content-length": "abc"})
+    assert response.status_code == 400
+
+
+def test_undecodable_image_is_422_without_object_repr(client):
+    response = client.post("/classify", files={"file": ("a.jpg", b"not an image")})
+    assert response.status_code == 422
+    assert "0x" not in response.json()["error"]
+
+
+def test_truncated_image_is_422(client, sample_images):
+    truncated = sample_images["chelsea.jpg"][:2000]
+    response = client.post("/classify", files={"file": ("a.jpg", truncated)})
+    assert response.status_code == 422
+    assert response.json()["error"] == "Image could not be decoded"
+
+
+@pytest.mark.parametrize("error", [ValueError, FileNotFoundError])
+def test_internal_value_and_os_errors_are_500(client, monkeypatch, error):
+    def fail(image_bytes):
+        raise error("internal detail")
+
+    monkeypatch.setattr(api, "classify_one", fail)
+    response = client.post("/classify", content=b"\xff\xd8\xff")
+    assert response.status_code == 500
+    assert "internal detail" not in response.text
+
+
+def test_unexpected_error_is_500(client, monkeypatch):
+    def fail(image_bytes):
+        raise RuntimeError("internal detail")
+
+    monkeypatch.setattr(api, "classify_one", fail)
+    response = client.post("/classify", content=b"\xff\xd8\xff")
+    assert response.status_code == 500
+    assert "internal detail" not in response.text
+
+
+def test_oversized_part_is_refused_while_parsing(client, monkeypatch):
+    from starlette.formparsers import MultiPartParser
+
+    monkeypatch.setattr(api, "IMAGE_MAX_BYTES", 1000)
+    spooled = []
+    original = MultiPartParser.on_part_data
+    monkeypatch.setattr(MultiPartParser, "on_part_data",
+                        lambda self, data, start, end: spooled.append(end - start) or original(self, data, start, end))
+
+    boundary = "limit"
+    head = (f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="a.jpg"\r\n'
+            f"Content-Type: image/jpeg\r\n\r\n").encode()
+
+    def body():
+        yield head
+        for _ in range(50):
+            yield b"\xff" * 1000
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post("/classify/batch", content=body(),
+                           headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+    assert sum(spooled) <= 1000
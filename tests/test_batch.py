@@ -0,0 +1,29 @@
+"""
+Every file in a batch source ends up as a result or an error row.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from helper.batch import _bounded_map, iter_sources, load_image_bytes
+
+
+def test_bad_files_get_error_rows(tmp_path, sample_images):
+    (tmp_path / "good.jpg").write_bytes(sample_images["chelsea.jpg"])
+    (tmp_path / "empty.jpg").write_bytes(b"")
+    (tmp_path / "text.png").write_bytes(b"not an image at all")
+    (tmp_path / "notes.txt").write_bytes(b"ignored: not an image extension")
+
+    items = ((name, image, None) for name, image in iter_sources(str(tmp_path)))
+    with ThreadPoolExecutor(2) as pool:
+        loaded = {os.path.basename(name): (data, error)
+                  for name, data, error in _bounded_map(pool, load_image_bytes, items, 4)}
+
+    assert sorted(loaded) == ["empty.jpg", "good.jpg", "text.png"]
+    assert loaded["good.jpg"][1] is None
+    assert "empty" in loaded["empty.jpg"][1]
+    assert "not a supported image" in loaded["text.png"][1]
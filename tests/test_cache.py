@@ -0,0 +1,143 @@
+"""
+TTLCache expiry, request coalescing, stale-while-revalidate and negative
+caching, with a fake clock.
+"""
+
+import threading
+import time
+import types
+
+import pytest
+
+from helper import cache as cache_module
+from helper.cache import TTLCache, ttl_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    fake = types.SimpleNamespace(monotonic=lambda: now[0])
+    monkeypatch.setattr(cache_module, "time", fake)
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+class Loader:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0) if len(self.values) > 1 else self.values[0]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def test_fresh_entries_are_served_until_expiry(clock):
+    cache = TTLCache(ttl=10, stale_ttl=0)
+    loader = Loader("v1", "v2")
+    assert cache.get_or_load("k", loader) == "v1"
+    clock(5)
+    assert cache.get_or_load("k", loader) == "v1"
+    assert loader.calls == 1
+
+    clock(6)
+    assert cache.get_or_load("k", loader) == "v2"
+    assert loader.calls == 2
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = TTLCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: cache.stats["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+
+
+def test_stale_value_is_served_while_refreshing(clock):
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load("k", lambda: "old")
+    clock(20)
+
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return "new"
+
+    assert cache.get_or_load("k", slow_loader) == "old"
+    assert cache.stats["stale_hits"] == 1
+    release.set()
+    _wait_until(lambda: cache.get_or_load("k", slow_loader) == "new")
+
+
+def test_failed_background_refresh_keeps_stale_value(clock):
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load("k", lambda: "old")
+    clock(20)
+    loader = Loader(RuntimeError("down"))
+    assert cache.get_or_load("k", loader) == "old"
+    _wait_until(lambda: loader.calls == 1 and not cache._inflight)
+    assert cache.get_or_load("k", loader) == "old"
+
+
+def test_errors_are_remembered_for_negative_ttl(clock):
+    cache = TTLCache(ttl=100, negative_ttl=5)
+    loader = Loader(RuntimeError("down"), "value")
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("k", loader)
+    assert loader.calls == 1
+    assert cache.stats["negative_hits"] == 1
+
+    clock(6)
+    assert cache.get_or_load("k", loader) == "value"
+    assert loader.calls == 2
+
+
+def test_negative_results_expire_after_negative_ttl(clock):
+    cache = TTLCache(ttl=100, negative_ttl=5, is_negative=lambda value: not value)
+    loader = Loader({}, {"Kalori": "52 kcal"})
+    assert cache.get_or_load("k", loader) == {}
+    clock(1)
+    assert cache.get_or_load("k", loader) == {}
+    clock(5)
+    assert cache.get_or_load("k", loader) == {"Kalori": "52 kcal"}
+
+
+def test_decorator_returns_copies(clock):
+    @ttl_cache()
+    def load(name):
+        return {"name": name}
+
+    load("a")["name"] = "changed"
+    assert load("a") == {"name": "a"}
+    assert load.cache.stats["hits"] == 1
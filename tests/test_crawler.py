@@ -0,0 +1,28 @@
+"""
+Offline crawls over the saved fixtures.
+"""
+
+import pytest
+
+from helper.crawler import RateLimiter, crawl, fixture_fetcher, main
+
+from .conftest import PAGES_DIR
+
+
+def test_missing_portion_fixture_fails_instead_of_serving_main_page(tmp_path):
+    counts = crawl(["apel"], str(tmp_path / "out.jsonl"), fixture_fetcher(PAGES_DIR), rate=1000)
+    assert counts == {"fetched": 1, "skipped": 0, "failed": 4}
+
+
+def test_main_page_only(tmp_path):
+    counts = crawl(["apel", "kiwi"], str(tmp_path / "out.jsonl"), fixture_fetcher(PAGES_DIR), rate=1000,
+                   include_portions=False)
+    assert counts == {"fetched": 2, "skipped": 0, "failed": 0}
+
+
+@pytest.mark.parametrize("rate", ["0", "-1"])
+def test_rate_must_be_positive(rate):
+    with pytest.raises(SystemExit):
+        main(["apel", "--rate", rate])
+    with pytest.raises(ValueError):
+        RateLimiter(float(rate))
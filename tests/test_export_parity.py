@@ -0,0 +1,52 @@
+"""
+Keras, TFLite and ONNX must agree on real photos.
+
+Skipped when TensorFlow, the exporter or the runtime for a format is not
+installed, or when model/model.pkl is missing.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("tensorflow")
+
+from helper.engine import KerasEngine, OnnxEngine, TFLiteEngine
+from helper.export import check_parity, export_onnx, export_tflite, load_parity_batch
+from helper.model_registry import MODEL_PATH, get_model
+
+from .conftest import IMAGES_DIR
+
+pytestmark = pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason=f"{MODEL_PATH} not found")
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model()
+
+
+@pytest.fixture(scope="module")
+def reference(model):
+    return KerasEngine(model)
+
+
+@pytest.fixture(scope="module")
+def batch():
+    batch = load_parity_batch(IMAGES_DIR)
+    assert len(batch) == len([name for name in os.listdir(IMAGES_DIR) if name.endswith(".jpg")])
+    return batch
+
+
+def test_tflite_matches_keras(model, reference, batch, tmp_path):
+    path = export_tflite(model, str(tmp_path / "model.tflite"))
+    result = check_parity(reference, TFLiteEngine(path), batch)
+    assert result["passed"], result
+
+
+def test_onnx_matches_keras(model, reference, batch, tmp_path):
+    pytest.importorskip("tf2onnx")
+    pytest.importorskip("onnxruntime")
+    path = export_onnx(model, str(tmp_path / "model.onnx"))
+    result = check_parity(reference, OnnxEngine(path), batch)
+    assert result["passed"], result
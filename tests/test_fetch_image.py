@@ -0,0 +1,71 @@
+"""
+URL downloads against a local HTTP server.
+"""
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from helper.functions import fetch_image
+
+from .conftest import IMAGES_DIR
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with open(f"{IMAGES_DIR}/chelsea.jpg", "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        if self.path == "/gzip":
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path == "/slow":
+            # A few bytes every 50 ms: no single socket read ever times out
+            for i in range(0, len(body), 16):
+                self.wfile.write(body[i:i + 16])
+                self.wfile.flush()
+                time.sleep(0.05)
+        else:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_deadline_aborts_slow_drip_download(server):
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="too long"):
+        fetch_image(f"{server}/slow", deadline=0.5)
+    assert time.monotonic() - start < 1.5
+
+
+def test_decode_is_opt_in(sample_images, server):
+    fetched = fetch_image(f"{server}/fast")
+    assert fetched.data == sample_images["chelsea.jpg"]
+    assert fetched.format == "JPEG" and fetched.image is None
+
+    decoded = fetch_image(f"{server}/fast", decode=True)
+    assert decoded.image.size == (451, 300)
+
+
+def test_gzip_body_is_decoded(sample_images, server):
+    fetched = fetch_image(f"{server}/gzip", chunk_size=1024, decode=True)
+    assert fetched.data == sample_images["chelsea.jpg"]
+    assert fetched.format == "JPEG" and fetched.image.size == (451, 300)
@@ -0,0 +1,99 @@
+"""
+Shared HTTP client against a local stub server: retries, timeouts and
+connection reuse.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from helper import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures = {}
+    hits = {}
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.hits[path] = self.hits.get(path, 0) + 1
+        if path == "/slow":
+            time.sleep(0.5)
+        status = 503 if self.failures.get(path, 0) > 0 else 200
+        if status == 503:
+            self.failures[path] -= 1
+        body = b"ok" if status == 200 else b"busy"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.failures, _Handler.hits = {}, {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_5xx_is_retried_with_backoff(server):
+    _Handler.failures["/flaky"] = 2
+    session = http_client.build_session(retries=3, backoff=0.1, jitter=0)
+    start = time.monotonic()
+    response = session.get(f"{server}/flaky", timeout=(1, 1))
+    elapsed = time.monotonic() - start
+
+    assert response.status_code == 200
+    assert _Handler.hits["/flaky"] == 3
+    # urllib3 sleeps backoff * 2 ** (n - 1) from the second retry on
+    assert elapsed >= 0.2
+
+
+def test_exhausted_retries_return_the_last_response(server):
+    _Handler.failures["/down"] = 10
+    session = http_client.build_session(retries=2, backoff=0, jitter=0)
+    response = session.get(f"{server}/down", timeout=(1, 1))
+    assert response.status_code == 503
+    assert _Handler.hits["/down"] == 3
+
+
+def test_read_timeout_is_retried_then_raised(server):
+    session = http_client.build_session(retries=1, backoff=0, jitter=0)
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.ConnectionError, match="Read timed out"):
+        session.get(f"{server}/slow", timeout=(1, 0.1))
+    assert time.monotonic() - start < 0.5 * 2
+    assert _Handler.hits["/slow"] == 2
+
+
+def test_default_timeouts_are_applied(monkeypatch):
+    seen = {}
+
+    class Session:
+        def get(self, url, **kwargs):
+            seen.update(kwargs)
+
+    monkeypatch.setattr(http_client, "get_session", lambda: Session())
+    http_client.get("http://example.invalid/")
+    assert seen["timeout"] == (http_client.HTTP_CONNECT_TIMEOUT, http_client.HTTP_READ_TIMEOUT)
+
+
+def test_connections_are_reused(server):
+    session = http_client.build_session()
+    for _ in range(3):
+        assert session.get(f"{server}/ok", timeout=(1, 1)).content == b"ok"
+
+    [stats] = http_client.http_stats(session).values()
+    assert stats == {"connections": 1, "requests": 3, "reused": 2}
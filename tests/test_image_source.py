@@ -0,0 +1,38 @@
+"""
+Folder scanning skips non-images and decodes straight from the mapped files.
+"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from helper.functions import preprocess_image
+from helper.image_source import iter_images
+
+
+def test_iter_images_filters_and_decodes_mapped_files(tmp_path, sample_images):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "b.jpg").write_bytes(sample_images["chelsea.jpg"])
+    (tmp_path / "nested" / "a.JPG").write_bytes(sample_images["coffee.jpg"])
+    (tmp_path / "empty.png").write_bytes(b"")
+    (tmp_path / "text.jpg").write_bytes(b"not an image at all")
+    (tmp_path / "notes.txt").write_bytes(sample_images["astronaut.jpg"])
+
+    seen = []
+    for path, image in iter_images(str(tmp_path)):
+        expected = sample_images["chelsea.jpg" if path.endswith("b.jpg") else "coffee.jpg"]
+        assert bytes(image) == expected
+        # Decoded twice from the same mapping: each decode reads from the start
+        first = preprocess_image(image)
+        np.testing.assert_array_equal(first, preprocess_image(image))
+        np.testing.assert_array_equal(first, preprocess_image(expected))
+        seen.append((os.path.relpath(path, tmp_path), image))
+
+    assert [name for name, _ in seen] == ["b.jpg", os.path.join("nested", "a.JPG")]
+    assert all(image.closed for _, image in seen)
+
+    unchecked = [os.path.basename(path) for path, _ in iter_images(str(tmp_path), check_magic=False)]
+    assert unchecked == ["b.jpg", "text.jpg", "a.JPG"]
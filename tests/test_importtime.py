@@ -0,0 +1,42 @@
+"""
+``-X importtime`` parsing sees imports at every depth.
+"""
+
+import pytest
+
+from benchmarks.bench_importtime import compare, forbidden_imports, parse_importtime
+
+STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       500 |        500 |       numpy.core
+import time:      1000 |       1500 |     numpy
+import time:       200 |       1700 |   PIL.Image
+import time:       300 |       2000 | helper.functions
+import time:       100 |        100 | json
+"""
+
+
+def test_transitive_imports_are_counted_once():
+    by_package = parse_importtime(STDERR)
+    assert by_package == {"numpy": 1.5, "PIL": 0.2, "helper": 0.3, "json": 0.1}
+    assert sum(by_package.values()) == pytest.approx(2.1)
+
+
+def test_forbidden_transitive_import():
+    report = {"packages": parse_importtime(STDERR)}
+    assert forbidden_imports("helper.prediction_cache", report) == []
+    assert forbidden_imports("helper", report) == ["PIL", "numpy"]
+
+
+def test_compare_ignores_platform_modules_and_noise():
+    baseline = {"helper": {"total_ms": 50.0, "packages": {"helper": 3.0, "requests": 10.0}}}
+    # Other platform's stdlib, site hooks, failed optional imports, jitter
+    packages = {"helper": 3.5, "requests": 11.0, "nt": 0.4, "_winapi": 0.3, "posix": 0.5,
+                "sitecustomize": 0.1, "simplejson": 0.1, "json": 4.0}
+    assert compare({"helper": {"total_ms": 80.0, "packages": packages}}, baseline, 0.25) == []
+
+    packages = {"helper": 3.0, "requests": 10.0, "numpy": 80.0}
+    assert compare({"helper": {"total_ms": 130.0, "packages": packages}}, baseline, 0.25) == [
+        "helper: 13.0 ms -> 93.0 ms",
+        "helper: now imports numpy",
+    ]
@@ -0,0 +1,62 @@
+"""
+MicroBatcher grouping, result routing and shutdown, with a stub engine.
+"""
+
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from helper.inference import MicroBatcher, fruits_list
+
+
+class StubEngine:
+    """
+    Returns a one-hot row for the class index stored in each input's first pixel.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, batch):
+        self.batch_sizes.append(len(batch))
+        indices = batch[:, 0, 0, 0].astype(int)
+        return np.eye(len(fruits_list), dtype=np.float32)[indices]
+
+
+def _array(index):
+    array = np.zeros((1, 224, 224, 3), dtype=np.float32)
+    array[0, 0, 0, 0] = index
+    return array
+
+
+def test_concurrent_submits_share_one_forward_pass():
+    engine = StubEngine()
+    batcher = MicroBatcher(predict_fn=engine, max_batch_size=len(fruits_list), max_wait_ms=500)
+    start = threading.Barrier(len(fruits_list))
+    results = {}
+
+    def worker(index):
+        start.wait()
+        results[index] = batcher.classify(b"", image_array=_array(index), timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(fruits_list))]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        batcher.close()
+
+    assert engine.batch_sizes == [len(fruits_list)]
+    assert results == {i: (fruit, 1.0) for i, fruit in enumerate(fruits_list)}
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(predict_fn=StubEngine(), max_wait_ms=0)
+    batcher.close()
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(b"", image_array=_array(0))
@@ -0,0 +1,58 @@
+"""
+Histogram bookkeeping and request context across threads.
+"""
+
+import gc
+import json
+import logging
+import threading
+
+import pytest
+
+from helper import metrics
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable()
+    metrics.reset()
+    yield
+    metrics.reset()
+    metrics.enable(metrics.METRICS_ENABLED)
+
+
+def test_exited_threads_are_merged_and_dropped(enabled):
+    def work():
+        metrics.observe("stage", 0.001)
+
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(metrics._thread_histograms) <= threading.active_count()
+    assert metrics.snapshot()["stage"]["count"] == 50
+
+
+def test_request_includes_forward_pass_on_batcher_thread(enabled, caplog):
+    np = pytest.importorskip("numpy")
+    from helper.inference import MicroBatcher
+
+    @metrics.timed("forward")
+    def predict(batch):
+        return np.eye(10, dtype=np.float32)[:len(batch)]
+
+    caplog.set_level(logging.INFO, logger="helper.metrics")
+    batcher = MicroBatcher(predict_fn=predict, max_wait_ms=0)
+    try:
+        with metrics.request("analyze") as fields:
+            fields["source"] = "test"
+            batcher.classify(b"", image_array=np.zeros((1, 224, 224, 3), dtype=np.float32))
+    finally:
+        batcher.close()
+
+    lines = [entry.getMessage() for entry in caplog.records if entry.name == "helper.metrics"]
+    record = json.loads(lines[-1])
+    assert record["name"] == "analyze" and record["source"] == "test"
+    assert "forward" in record["stages_ms"]
@@ -0,0 +1,90 @@
+"""
+NutritionStore against a temporary SQLite file and a fake scraper.
+"""
+
+import time
+
+import pytest
+
+from helper.nutrition_store import NutritionStore, fallback_nutrition
+
+APEL = ({"Kalori": "52 kcal", "Protein": "0.3 g"}, "100 gram")
+
+
+class FakeScraper:
+    def __init__(self, result=APEL):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, food_name):
+        self.calls.append(food_name)
+        return self.result
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "nutrition.sqlite")
+
+
+def test_missing_food_falls_back_to_builtin_table(db_path):
+    store = NutritionStore(path=db_path, fetch=FakeScraper(), background_refresh=False)
+    assert store.get("Kiwi") == fallback_nutrition("Kiwi")
+    assert store.get("Durian") == ({}, 0)
+
+
+def test_entries_persist_across_instances(db_path):
+    NutritionStore(path=db_path, fetch=None, background_refresh=False).update("Apel", *APEL)
+    reopened = NutritionStore(path=db_path, fetch=None, background_refresh=False)
+    assert reopened.get("Apel") == APEL
+    assert not reopened.is_stale("Apel")
+
+
+def test_staleness(db_path):
+    store = NutritionStore(path=db_path, max_age=60, fetch=None, background_refresh=False)
+    store.update("Apel", *APEL, fetched_at=time.time() - 120)
+    store.update("Kiwi", *APEL)
+    assert store.is_stale("Apel") and store.is_stale("Durian")
+    assert store.stale_foods() == ["Apel"]
+    # Stale entries are still served
+    assert store.get("Apel") == APEL
+
+
+def test_stale_read_refreshes_in_background_once(db_path):
+    scraper = FakeScraper(({"Kalori": "60 kcal"}, "100 gram"))
+    store = NutritionStore(path=db_path, max_age=60, fetch=scraper, background_refresh=False)
+    store.update("Apel", *APEL, fetched_at=time.time() - 120)
+
+    thread = store.refresh_in_background(["Apel"])
+    assert store.refresh_in_background(["Apel"]) is None
+    thread.join(5)
+
+    assert scraper.calls == ["Apel"]
+    assert store.get("Apel") == ({"Kalori": "60 kcal"}, "100 gram")
+
+
+def test_empty_scrape_keeps_previous_entry(db_path):
+    store = NutritionStore(path=db_path, fetch=FakeScraper(({}, 0)), background_refresh=False)
+    store.update("Apel", *APEL)
+    assert store.refresh("Apel") is False
+    assert store.get("Apel") == APEL
+
+
+def test_listener_replay_and_updates(db_path):
+    store = NutritionStore(path=db_path, fetch=None, background_refresh=False)
+    store.update("Apel", *APEL)
+    seen = []
+    store.add_listener(lambda food, nutrition, volume: seen.append((food, nutrition, volume)), replay=True)
+    store.update("Kiwi", {"Kalori": "61 kcal"}, "100 gram")
+    assert seen == [("Apel",) + APEL, ("Kiwi", {"Kalori": "61 kcal"}, "100 gram")]
+
+
+def test_read_of_missing_food_triggers_refresh(db_path):
+    scraper = FakeScraper()
+    store = NutritionStore(path=db_path, fetch=scraper, background_refresh=True)
+    assert store.get("Apel") == fallback_nutrition("Apel")
+
+    deadline = time.time() + 5
+    while store.is_stale("Apel") and time.time() < deadline:
+        time.sleep(0.01)
+    assert scraper.calls == ["Apel"]
+    assert store.get("Apel") == APEL
@@ -0,0 +1,36 @@
+"""
+Branch-and-bound and brute force agree, including when every slot is forced.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from helper.optimizer import GOAL_OBJECTIVES, brute_force_top, score_sums, top_combinations
+
+from .conftest import make_catalogue
+
+CATALOGUE = make_catalogue(12)
+FOODS = list(CATALOGUE)
+
+
+@pytest.mark.parametrize("goal", sorted(GOAL_OBJECTIVES))
+@pytest.mark.parametrize("k, must_include", [
+    (3, None), (2, FOODS[0]), (1, FOODS[0]), (2, FOODS[:2]), (1, FOODS[:2]),
+])
+def test_top_combinations_matches_brute_force(goal, k, must_include):
+    objective = GOAL_OBJECTIVES[goal]
+    best = top_combinations(k, objective, 5, must_include, CATALOGUE)
+    reference = brute_force_top(k, objective, 5, must_include, CATALOGUE)
+    assert [r['fruits'] for r in best] == [r['fruits'] for r in reference]
+    assert np.allclose([r['score'] for r in best], [r['score'] for r in reference])
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_k_below_one_is_rejected(k):
+    objective = GOAL_OBJECTIVES["lose_weight"]
+    for search in (top_combinations, brute_force_top):
+        with pytest.raises(ValueError, match="at least 1"):
+            search(k, objective, 5, None, CATALOGUE)
+    with pytest.raises(ValueError, match="at least 1"):
+        score_sums(np.zeros(5), k, objective)
@@ -0,0 +1,44 @@
+"""
+Every installed parser backend must extract the same FoodPage.
+"""
+
+import pytest
+
+from helper.parsers import FoodPage, available_backends, parse_food_page
+
+from .conftest import load_pages
+
+BACKENDS = available_backends()
+EDGE_CASES = {
+    "empty": b"",
+    "whitespace": b"  \n",
+    "no-charset": (
+        "<html><body><table class='generic'><tr class='selected'><td>½ buah</td></tr></table>"
+        "</body></html>"
+    ).encode("utf-8"),
+}
+PAGES = {**load_pages(), **EDGE_CASES}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_backends_agree(name, backend):
+    assert parse_food_page(PAGES[name], backend) == parse_food_page(PAGES[name], "html.parser")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_body_gives_empty_page(backend):
+    assert parse_food_page(b"", backend) == FoodPage({}, 0, {})
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_utf8_without_meta_charset(backend):
+    assert parse_food_page(EDGE_CASES["no-charset"], backend).default_volume == "½ buah"
+
+
+def test_saved_page_values():
+    page = parse_food_page(PAGES["pisang.html"], "html.parser")
+    assert page.nutrition == {'Kalori': '89 kcal', 'Lemak': '0.33 g', 'Karbohidrat': '22.84 g',
+                              'Protein': '1.09 g'}
+    assert page.default_volume == "½ buah"
+    assert list(page.portion_links) == ['1 buah', '100 gram', '1 mangkok', '1 porsi']
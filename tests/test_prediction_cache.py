@@ -0,0 +1,61 @@
+"""
+Prediction cache keys, LRU to SQLite fall-through and model checksum
+invalidation.
+"""
+
+import pytest
+
+from helper.prediction_cache import PredictionCache, image_key
+
+
+def test_key_depends_only_on_bytes():
+    assert image_key(b"abc") == image_key(bytearray(b"abc"))
+    assert image_key(b"abc") != image_key(b"abd")
+
+
+def test_get_or_compute_caches_results_but_not_errors():
+    cache = PredictionCache(max_entries=4)
+    calls = []
+    assert cache.get_or_compute(b"img", lambda: calls.append(1) or ("Apel", 0.9)) == ("Apel", 0.9)
+    assert cache.get_or_compute(b"img", lambda: calls.append(1) or ("Kiwi", 0.1)) == ("Apel", 0.9)
+    assert calls == [1]
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(b"other", fail)
+    assert cache.get(image_key(b"other")) is None
+
+
+def test_evicted_entries_fall_through_to_sqlite(tmp_path):
+    cache = PredictionCache(max_entries=1, disk_path=str(tmp_path / "cache.db"), checksum="a")
+    cache.put("first", ("Apel", 0.9))
+    cache.put("second", ("Kiwi", 0.8))
+
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.get("first") == ("Apel", 0.9)
+    assert cache.disk_hits == 1
+
+
+def test_reopen_with_same_checksum_keeps_entries(tmp_path):
+    path = str(tmp_path / "cache.db")
+    PredictionCache(disk_path=path, checksum="a").put("key", ("Apel", 0.9))
+    assert PredictionCache(disk_path=path, checksum="a").get("key") == ("Apel", 0.9)
+
+
+def test_reopen_with_new_checksum_misses(tmp_path):
+    path = str(tmp_path / "cache.db")
+    PredictionCache(disk_path=path, checksum="a").put("key", ("Apel", 0.9))
+
+    reopened = PredictionCache(disk_path=path, checksum="b")
+    assert reopened.get("key") is None
+    assert reopened.misses == 1
+
+
+def test_invalidate_clears_both_tiers(tmp_path):
+    cache = PredictionCache(disk_path=str(tmp_path / "cache.db"), checksum="a")
+    cache.put("key", ("Apel", 0.9))
+    cache.invalidate("b")
+    assert cache.get("key") is None
+    assert cache.checksum == "b"
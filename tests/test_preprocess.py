@@ -0,0 +1,49 @@
+"""
+Model inputs must match a plain full decode of the photo.
+"""
+
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from helper.functions import ImageDecodeError, load_image, load_preview, preprocess_batch, preprocess_image
+
+
+def reference(image_bytes, target_size=(224, 224)):
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB").resize(target_size)
+    return np.asarray(image, dtype=np.float32) / 255.0
+
+
+def test_preprocess_matches_full_decode(sample_images):
+    for name, image_bytes in sample_images.items():
+        np.testing.assert_allclose(preprocess_image(image_bytes)[0], reference(image_bytes), atol=1e-6,
+                                   err_msg=name)
+
+
+def test_preprocess_batch_matches_full_decode(sample_images):
+    batch = preprocess_batch(list(sample_images.values()))
+    for row, image_bytes in zip(batch, sample_images.values()):
+        np.testing.assert_allclose(row, reference(image_bytes), atol=1e-6)
+
+
+def test_load_image_matches_full_decode(sample_images):
+    for image_bytes in sample_images.values():
+        array, preview = load_image(image_bytes)
+        np.testing.assert_allclose(array[0], reference(image_bytes), atol=1e-6)
+        assert preview.size == (200, 200)
+
+
+def test_preview_is_draft_decoded_at_preview_size(sample_images):
+    for image_bytes in sample_images.values():
+        assert load_preview(image_bytes, (100, 80)).size == (100, 80)
+
+
+
+def test_undecodable_bytes_raise_image_decode_error(sample_images):
+    # Unknown format, then a truncated JPEG that PIL reports as a plain OSError
+    for data in (b"not an image", sample_images["chelsea.jpg"][:2000]):
+        with pytest.raises(ImageDecodeError):
+            preprocess_image(data)
@@ -0,0 +1,37 @@
+"""
+Worker processes filling shared buffers produce exactly the in-process batch.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from helper.functions import preprocess_batch
+from helper.preprocess_pool import SharedBatchPool
+
+
+def test_shared_batches_match_preprocess_batch(tmp_path, sample_images):
+    path = tmp_path / "chelsea.jpg"
+    path.write_bytes(sample_images["chelsea.jpg"])
+
+    # Three rounds of every photo plus a file path: many more batches than slots
+    items = [(f"{name}#{round_}", image, None)
+             for round_ in range(3) for name, image in sample_images.items()]
+    items.insert(4, ("broken", b"not an image at all", None))
+    items.append(("path", str(path), None))
+    expected = {name: image for name, image, _ in items if name != "broken"}
+    expected["path"] = sample_images["chelsea.jpg"]
+
+    names, rows, failures = [], [], []
+    with SharedBatchPool(workers=2, batch_size=2, slots=2) as pool:
+        for batch_names, batch, batch_failures in pool.iter_batches(iter(items)):
+            # The view is only valid until the next batch is requested
+            rows.append(batch.copy())
+            names += batch_names
+            failures += batch_failures
+
+    assert len(rows) > 2
+    assert names == list(expected)
+    assert [name for name, _ in failures] == ["broken"]
+    np.testing.assert_array_equal(np.concatenate(rows), preprocess_batch(list(expected.values())))
@@ -0,0 +1,38 @@
+"""
+The recommendation engine follows the nutrition store without touching
+the built-in table.
+"""
+
+import copy
+
+import pytest
+
+from helper import recommendations
+from helper.nutrition_store import NutritionStore, fruits_nutrition_db
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = NutritionStore(path=str(tmp_path / "nutrition.db"), fetch=None, background_refresh=False)
+    monkeypatch.setattr(recommendations, "get_nutrition_store", lambda: store)
+    monkeypatch.setattr(recommendations, "_engine", None)
+    return store
+
+
+def test_engine_is_seeded_from_existing_entries(store):
+    store.update("Apel", {"Kalori": "99 kcal", "Protein": "0,5 g"}, "100 gram")
+    engine = recommendations.get_recommendation_engine()
+    assert engine.nutrition["Apel"]["kalori"] == 99
+    assert engine.nutrition["Apel"]["protein"] == 0.5
+
+
+def test_updates_do_not_mutate_builtin_table(store):
+    before = copy.deepcopy(fruits_nutrition_db)
+    engine = recommendations.get_recommendation_engine()
+    store.update("Kiwi", {"Kalori": "70 kcal"}, "100 gram")
+
+    assert engine.nutrition["Kiwi"]["kalori"] == 70
+    assert fruits_nutrition_db == before
+    combination = next(c for c in engine.get("Kiwi", "lose_weight")["combinations"] if "Kiwi" in c["fruits"])
+    fruits = combination["fruits"]
+    assert combination["total_cal"] == sum(engine.nutrition[f]["kalori"] for f in fruits) // len(fruits)
@@ -0,0 +1,64 @@
+"""
+Spellings of the same food share one cached fatsecret fetch.
+"""
+
+import pytest
+
+from helper import scrap
+
+
+class _Response:
+    content = b"<html><body></body></html>"
+
+    def raise_for_status(self):
+        pass
+
+
+def test_food_name_spellings_share_cache_entry(monkeypatch):
+    urls = []
+    monkeypatch.setattr(scrap.http_client, "get", lambda url: urls.append(url) or _Response())
+    scrap.fetch_food_page.cache.clear()
+
+    scrap.fetch_food_page("Apel")
+    scrap.fetch_food_page("apel", None)
+    scrap.scrape_portion_links("Apel")
+    scrap.scrape_nutrition_data("apel")
+
+    assert urls == [scrap.FATSECRET_BASE_URL + "apel"]
+
+
+def test_error_status_is_not_parsed_as_empty_page(monkeypatch):
+    requests = pytest.importorskip("requests")
+
+    class ErrorResponse(_Response):
+        def raise_for_status(self):
+            raise requests.HTTPError("503 Server Error")
+
+    monkeypatch.setattr(scrap.http_client, "get", lambda url: ErrorResponse())
+    scrap.fetch_food_page.cache.clear()
+    with pytest.raises(requests.HTTPError):
+        scrap.fetch_food_page("Apel")
+
+
+def test_aliased_fruit_requests_exact_urls(monkeypatch):
+    page = (
+        b'<html><body><table class="generic"><tr class="selected"><td>'
+        b'<a href="/kalori-gizi/umum/buah-kiwi?portionid=58301&amp;portionamount=1,000">1 buah</a>'
+        b'</td></tr></table></body></html>'
+    )
+
+    class PageResponse(_Response):
+        content = page
+
+    urls = []
+    monkeypatch.setattr(scrap.http_client, "get", lambda url: urls.append(url) or PageResponse())
+    scrap.fetch_food_page.cache.clear()
+
+    links = scrap.scrape_portion_links("Kiwi")
+    assert links[0]["url"] == "?portionid=58301&portionamount=1,000"
+    scrap.scrape_nutrition_data("Kiwi", links[0]["url"])
+
+    assert urls == [
+        scrap.FATSECRET_BASE_URL + "buah-kiwi",
+        scrap.FATSECRET_BASE_URL + "buah-kiwi?portionid=58301&portionamount=1,000",
+    ]